@@ -27,6 +27,16 @@ export default async function BlogPost(context: { params: Promise<{ slug: string
         notFound()
     }
 
+    // Relative asset paths like "assets/image_0.png" map to /blog-assets/[slug]/assets/image_0.png
+    const assetSrc = (src: string) => {
+        if (!src || src.startsWith('http')) {
+            return src;
+        }
+        const cleanSrc = src.replace(/^\.\//, ''); // remove leading ./
+        const basePath = '';
+        return `${basePath}/blog-assets/${slug}/${cleanSrc}`;
+    }
+
     return (
         <main className="min-h-screen bg-background">
             <Navigation />
@@ -82,11 +92,8 @@ export default async function BlogPost(context: { params: Promise<{ slug: string
                                 img: ({ node, ...props }) => {
                                     // Rewrite image src to point to our route handler if it's a local asset
                                     let src = props.src;
-                                    if (typeof src === 'string' && src && !src.startsWith('http')) {
-                                        // If it's a relative path like "assets/image_0.png", map it to /blog-assets/[slug]/assets/image_0.png
-                                        const cleanSrc = src.replace(/^\.\//, ''); // remove leading ./
-                                        const basePath = '';
-                                        src = `${basePath}/blog-assets/${slug}/${cleanSrc}`;
+                                    if (typeof src === 'string') {
+                                        src = assetSrc(src);
                                     }
                                     return (
                                         <div className="my-8">
@@ -98,6 +105,36 @@ export default async function BlogPost(context: { params: Promise<{ slug: string
                                         </div>
                                     );
                                 },
+                                picture: ({ node }) => {
+                                    // Optimized figures: a WebP <source> plus the fallback <img>. Rebuilt here
+                                    // so the <img> stays a direct child of <picture> (the img renderer wraps it)
+                                    const sources: { type: string, srcSet: string }[] = [];
+                                    let img: Record<string, unknown> = {};
+                                    for (const child of node?.children ?? []) {
+                                        if (child.type !== 'element') continue;
+                                        if (child.tagName === 'source') {
+                                            sources.push({ type: String(child.properties.type ?? ''), srcSet: assetSrc(String(child.properties.srcSet ?? '')) });
+                                        } else if (child.tagName === 'img') {
+                                            img = child.properties;
+                                        }
+                                    }
+                                    return (
+                                        <div className="my-8">
+                                            <picture>
+                                                {sources.map((source) => (
+                                                    <source key={source.srcSet} type={source.type} srcSet={source.srcSet} />
+                                                ))}
+                                                <img
+                                                    src={assetSrc(String(img.src ?? ''))}
+                                                    alt={String(img.alt ?? '')}
+                                                    width={img.width as number | undefined}
+                                                    height={img.height as number | undefined}
+                                                    className="rounded-lg border border-border w-full h-auto"
+                                                />
+                                            </picture>
+                                        </div>
+                                    );
+                                },
                                 // Style other elements if needed
                                 h1: ({ node, ...props }) => <h1 className="text-3xl font-bold mt-12 mb-6" {...props} />,
                                 h2: ({ node, ...props }) => <h2 className="text-xl font-semibold mt-10 mb-5" {...props} />,
@@ -0,0 +1,276 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import zlib
+import struct
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import statistics
+import tracemalloc
+import contextlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import gen
+import markdownify
+import scrape_publications
+
+# Benchmarks for the content pipeline scripts, on synthetic fixtures whose size
+# is set from the command line. Results go to a JSON file so runs on two
+# commits can be compared (--compare).
+
+DEFAULT_SIZES = {'triangles': 800, 'chunks': 4, 'blocks': 50, 'figures': 2, 'entries': 200}
+QUICK_SIZES = {'triangles': 200, 'chunks': 1, 'blocks': 20, 'figures': 1, 'entries': 50}
+RESULTS_FILE = "benchmark-results.json"
+REPEAT = 5
+
+# --- FIXTURES ---
+
+WORDS = ("deep learning theory cortex vision memory neural network invariance sparse "
+         "compositional hierarchical representation object recognition visual model").split()
+
+def triangle_size_for(n, width=gen.WIDTH, height=gen.HEIGHT):
+    """ TRIANGLE_SIZE giving a mesh of about n triangles on a width x height canvas. """
+    def count(size):
+        _, _, cols, rows, _, _ = gen._mesh_grid(width, height, {'width': width, 'height': height,
+                                                                'triangle_size': size})
+        return 2 * cols * rows
+    low, high = 1.0, float(max(width, height))
+    for _ in range(40):
+        mid = (low + high) / 2
+        if count(mid) > n:
+            low = mid
+        else:
+            high = mid
+    return min((low, high), key=lambda size: abs(count(size) - n))
+
+def words(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def png_bytes(width=64, height=48):
+    """ A small valid RGB PNG, served to process_file as every figure. """
+    raw = b"".join(b"\x00" + bytes(v for x in range(width) for v in (x * 4 % 256, y * 5 % 256, 128))
+                   for y in range(height))
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+def reducto_export(path, chunks, blocks, figures, image_base, seed=0):
+    """
+    Writes a Reducto-shaped parse result with `chunks` chunks of `blocks`
+    blocks each, `figures` of them per chunk being figures served from
+    image_base.
+    """
+    rng = random.Random(seed)
+    types = ['Text'] * 6 + ['List Item'] * 2 + ['Section Header', 'Footer']
+    result_chunks = []
+    for c in range(chunks):
+        chunk_blocks = []
+        figure_at = set(rng.sample(range(blocks), min(figures, blocks)))
+        for b in range(blocks):
+            block = {'type': rng.choice(types), 'bbox': {'page': c + 1}, 'content': words(rng, rng.randint(5, 60)),
+                     'image_url': None, 'confidence': "high"}
+            if c == 0 and b == 0:
+                block.update(type='Title', content="Benchmark Post " + words(rng, 3))
+            elif b in figure_at:
+                block.update(type='Figure', image_url=f"{image_base}/figure-{c}-{b}.png?X-Amz-Signature={rng.getrandbits(64):x}")
+            chunk_blocks.append(block)
+        result_chunks.append({'content': "", 'embed': "", 'blocks': chunk_blocks})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'job_id': "benchmark", 'result': {'type': "full", 'chunks': result_chunks}}, f)
+
+def biblio_page(path, entries, seed=0):
+    """ Writes a CBMM biblio listing with `entries` entries in year sections. """
+    rng = random.Random(seed)
+    out = ['<html><head><title>Publications</title></head><body><div class="view-content">']
+    year = 2024
+    for i in range(entries):
+        if i % 25 == 0:
+            if i:
+                out.append('</div>')
+            out.append(f'<div class="biblio-category-section"><div class="biblio-separator-bar">{year}</div>')
+            year -= 1
+        pdf = (f'<span class="biblio_file_links"><span class="file"><a href="https://cbmm.mit.edu/sites/default/'
+               f'files/publications/paper_{i}.pdf">paper_{i}.pdf</a></span> (1.2 MB)</span>') if i % 3 else ""
+        out.append(f'<div class="biblio-entry"><span class="biblio-authors"><a href="/people/{i % 40}">'
+                   f'{words(rng, 2).title()}</a>, and <a href="/people/{i % 17}">{words(rng, 2).title()}</a></span>'
+                   f'<a href="/publications/{i}"><span class="biblio-title">{words(rng, rng.randint(3, 10)).capitalize()}'
+                   f'</span></a>. <i>{words(rng, 3).title()}</i> ({year + 1}). {pdf}'
+                   f'<span class="Z3988" title="ctx_ver=Z39.88-2004"></span></div>')
+    out.append('</div></div></body></html>')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(out))
+
+class _FigureHandler(BaseHTTPRequestHandler):
+    """ Serves the same PNG for every path, standing in for Reducto's S3 bucket. """
+    body = png_bytes()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', "image/png")
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+@contextlib.contextmanager
+def figure_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FigureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+
+@contextlib.contextmanager
+def working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+# --- RUNNER ---
+
+def measure(fn, setup=None, repeat=REPEAT):
+    """
+    Times fn() `repeat` times (after one warm-up call), then runs it once more
+    under tracemalloc for the peak traced allocation. setup(), if given, runs
+    untimed before every call and its result is passed to fn. The scripts'
+    progress prints are swallowed.
+    """
+    def call():
+        arg = setup() if setup else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn(arg) if setup else fn()
+            return time.perf_counter() - start
+
+    call()
+    times = [call() for _ in range(repeat)]
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(arg) if setup else fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'min': min(times), 'median': statistics.median(times), 'runs': len(times), 'peak_bytes': peak}
+
+def run_benchmarks(sizes, repeat=REPEAT):
+    """ Runs every benchmark on fixtures of the given sizes; returns the result records. """
+    results = []
+    def record(name, params, stats):
+        results.append(dict(name=name, params=params, **stats))
+        print(f"  {name:<22} {stats['median'] * 1000:9.2f} ms median  {stats['min'] * 1000:9.2f} ms min  "
+              f"{stats['peak_bytes'] / 1e6:8.2f} MB peak  {params}")
+
+    size = triangle_size_for(sizes['triangles'])
+    config = {'triangle_size': size}
+    mesh_params = {'triangles': len(gen.generate_global_mesh(gen.WIDTH, gen.HEIGHT, random.Random(0), config)),
+                   'triangle_size': round(size, 3)}
+
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as tmp:
+        record("generate_global_mesh", mesh_params, measure(
+            lambda: gen.generate_global_mesh(gen.WIDTH, gen.HEIGHT, random.Random(1), config), repeat=repeat))
+        cover_path = os.path.join(tmp, "cover.svg")
+        record("generate_blog_cover", mesh_params, measure(
+            lambda: gen.generate_blog_cover(seed=1, filename=cover_path, unique_id="bench", config=config),
+            repeat=repeat))
+
+        export = os.path.join(tmp, "export.json")
+        md_params = {k: sizes[k] for k in ('chunks', 'blocks', 'figures')}
+        runs = iter(range(1 << 30))
+        def fresh_output():
+            # Cold run: empty asset cache and output directory every time
+            target = os.path.join(tmp, f"md-{next(runs)}")
+            return markdownify.load_asset_cache(os.path.join(target, "cache")), os.path.join(target, "out")
+        def convert(arg):
+            cache, output_dir = arg
+            markdownify.process_file(export, cache=cache, slug="bench", output_dir=output_dir)
+            shutil.rmtree(os.path.dirname(output_dir))
+        with figure_server() as base:
+            reducto_export(export, sizes['chunks'], sizes['blocks'], sizes['figures'], base)
+            record("process_file", md_params, measure(convert, setup=fresh_output, repeat=repeat))
+
+        pages = os.path.join(tmp, "pages")
+        os.makedirs(pages)
+        biblio_page(os.path.join(pages, "cbmm_page_0.html"), sizes['entries'])
+        with working_dir(pages):
+            for backend in sorted(scrape_publications.BACKENDS):
+                record(f"parse_cbmm_page[{backend}]", {'entries': sizes['entries']}, measure(
+                    lambda: scrape_publications.parse_cbmm_page(0, backend), repeat=repeat))
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(base_path, results, max_slowdown):
+    """
+    Prints each benchmark's time (best of its runs, the least noisy figure)
+    and peak memory relative to a previous results file. Returns False if any
+    got slower than max_slowdown times the base. Benchmarks run with other
+    sizes are skipped.
+    """
+    with open(base_path, 'r', encoding='utf-8') as f:
+        base = {(r['name'], json.dumps(r['params'], sort_keys=True)): r for r in json.load(f)['results']}
+    ok = True
+    print(f"Compared with {base_path}:")
+    for result in results:
+        previous = base.get((result['name'], json.dumps(result['params'], sort_keys=True)))
+        if not previous:
+            print(f"  {result['name']:<22} (no matching baseline)")
+            continue
+        ratio = result['min'] / previous['min']
+        memory = result['peak_bytes'] / max(previous['peak_bytes'], 1)
+        flag = "  REGRESSION" if ratio > max_slowdown else ""
+        print(f"  {result['name']:<22} time x{ratio:.2f}  memory x{memory:.2f}{flag}")
+        ok = ok and ratio <= max_slowdown
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the cover generator, markdown converter and publication scraper.")
+    parser.add_argument('--triangles', type=int, help=f"mesh size (default: {DEFAULT_SIZES['triangles']})")
+    parser.add_argument('--chunks', type=int, help=f"Reducto chunks (default: {DEFAULT_SIZES['chunks']})")
+    parser.add_argument('--blocks', type=int, help=f"blocks per chunk (default: {DEFAULT_SIZES['blocks']})")
+    parser.add_argument('--figures', type=int, help=f"figures per chunk (default: {DEFAULT_SIZES['figures']})")
+    parser.add_argument('--entries', type=int, help=f"biblio entries per page (default: {DEFAULT_SIZES['entries']})")
+    parser.add_argument('--quick', action='store_true', help="small fixtures, for a smoke run")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="timed runs per benchmark")
+    parser.add_argument('-o', '--output', default=RESULTS_FILE, help=f"results file (default: {RESULTS_FILE})")
+    parser.add_argument('--compare', metavar='JSON', help="results file from another commit to compare against")
+    parser.add_argument('--max-slowdown', type=float, default=1.2,
+                        help="with --compare, exit 1 if a benchmark is this many times slower (default: 1.2)")
+    args = parser.parse_args(argv)
+
+    sizes = dict(QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    sizes.update({k: getattr(args, k) for k in sizes if getattr(args, k) is not None})
+
+    print(f"Running benchmarks ({args.repeat} runs each)...")
+    results = run_benchmarks(sizes, repeat=args.repeat)
+    report = {'commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(),
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'sizes': sizes, 'repeat': args.repeat, 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {args.output}")
+
+    if args.compare and not compare(args.compare, results, args.max_slowdown):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import instrumentation
+import markdownify
+import regenerate_icons
+import scrape_publications
+import gen
+
+# Rebuilds the site's generated content as a graph of nodes:
+#
+#   publications      saved CBMM / CBCL pages -> app/data/publications.json (+ shards)
+#   markdown:<slug>   one Reducto export      -> content/blogs/<slug>/blog.md + assets
+#   cover:<slug>      the slug (its seed)     -> content/blogs/<slug>/blog.svg
+#
+# A node's inputs are files plus params, including the source of the script
+# that builds it. A node runs only if their fingerprint changed since its
+# last successful build or one of its outputs is missing or was modified.
+# Nodes whose dependencies are done run concurrently.
+#
+# Posts are edited by hand after conversion, so markdown nodes never overwrite
+# a blog.md they didn't write or that changed since: existing posts are adopted
+# as they are on the first build, edits are kept, and only --force regenerates
+# them.
+#
+# --watch keeps this process running as a warm worker: modules stay imported,
+# file digests, build state and the asset cache stay in memory, and every
+# change to the watched inputs triggers one (debounced) rebuild of whatever it
+# made stale. Saving an existing blog.md triggers nothing: posts are the
+# authors' to edit.
+
+BLOG_DIR = regenerate_icons.BLOG_DIR
+BUILD_STATE_FILE = ".build-state.json"
+BUILD_STATE_VERSION = 1
+BUILD_WORKERS = 4
+
+# Watch mode polls (no inotify dependency); a burst of changes, such as a bulk
+# copy, is built once it has been quiet for WATCH_DEBOUNCE seconds.
+WATCH_INTERVAL = 0.2
+WATCH_DEBOUNCE = 0.5
+
+# --- FINGERPRINTS ---
+
+class _FileDigests:
+    """ sha256 of files, rehashing only those whose size or mtime changed since the last build. """
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+        self.lock = threading.Lock()
+
+    def digest(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self.lock:
+            entry = self.known.get(path)
+        if entry and entry['stat'] == stamp:
+            return entry['sha256']
+        with open(path, 'rb') as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        with self.lock:
+            self.known[path] = {'stat': stamp, 'sha256': sha256}
+        return sha256
+
+def input_key(node, digests):
+    """ Fingerprint of a node's declared inputs: file contents and params. """
+    files = [(path, digests.digest(path)) for path in sorted(node['inputs'])]
+    payload = json.dumps([node['name'], files, node['params']], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def stale_reason(node, record, key, digests):
+    """ Why node needs to run, or None if its last build is still current. """
+    if not record:
+        return "never built"
+    if record['key'] != key:
+        return "inputs changed"
+    for path, sha256 in record['outputs'].items():
+        current = digests.digest(path)
+        if current is None:
+            return f"{path} missing"
+        if current != sha256:
+            return f"{path} modified"
+    return None
+
+def hand_edit_outcome(node, record, key, digests):
+    """
+    For a node whose outputs may be edited by hand: (status, reason, record)
+    when it must not run, else None (see stale_reason). Outputs with no build
+    record are adopted as they are, outputs changed since the last build are
+    kept and marked as edited, and an edited node whose inputs change is
+    skipped with a warning, once.
+    """
+    current = {path: digests.digest(path) for path in node['outputs']}
+    if any(sha256 is None for sha256 in current.values()):
+        return None
+    if not record:
+        return "adopted", "existing output taken over", {'key': key, 'outputs': current, 'edited': True}
+    edited = [path for path, sha256 in current.items() if record['outputs'].get(path) != sha256]
+    if edited:
+        record = dict(record, outputs=current, edited=True)
+    if not record.get('edited') or (not edited and record['key'] == key):
+        return None
+    if record['key'] != key:
+        return ("skipped", "inputs changed, but the output was edited by hand; --force overwrites it",
+                dict(record, key=key))
+    return "kept", f"{', '.join(edited)} edited by hand", record
+
+def load_state(path=BUILD_STATE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    if state.get('version') != BUILD_STATE_VERSION:
+        state = {'version': BUILD_STATE_VERSION}
+    state.setdefault('nodes', {})
+    state.setdefault('files', {})
+    return state
+
+def save_state(state, path=BUILD_STATE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+# --- NODES ---
+
+def node(name, inputs, params, outputs, run, deps=(), lock=None, editable=False):
+    """
+    A graph node. run() builds the outputs and returns True on success; nodes
+    sharing a lock name never run at the same time. editable outputs may be
+    edited by hand and are only overwritten with --force (see hand_edit_outcome).
+    """
+    return {'name': name, 'inputs': list(inputs), 'params': params, 'outputs': list(outputs),
+            'run': run, 'deps': list(deps), 'lock': lock, 'editable': editable}
+
+def export_slugs(exports, state, digests):
+    """
+    Slug of each Reducto export, as markdownify would pick it (collisions
+    resolved in input order). Reuses the slug recorded for unchanged files.
+    """
+    known = state.setdefault('slugs', {})
+    slugs = []
+    for filename in exports:
+        sha256 = digests.digest(filename)
+        entry = known.get(filename)
+        if not entry or entry['sha256'] != sha256:
+            entry = known[filename] = {'sha256': sha256, 'slug': markdownify.blog_slug(filename)}
+        slugs.append(entry['slug'])
+    return markdownify.resolve_slugs(exports, slugs)
+
+def build_graph(pages, exports, state, digests, asset_cache=None):
+    """
+    The nodes for the given saved pages and Reducto exports, plus a cover for
+    every post. Markdown nodes use asset_cache if given (and save it after
+    each conversion) instead of loading the index from disk every time.
+    """
+    nodes = []
+    if pages:
+        def run_publications():
+            scrape_publications.main(pages)
+            return True
+        nodes.append(node('publications', pages + [scrape_publications.__file__],
+                          {'parser': scrape_publications.PARSER_VERSION},
+                          [scrape_publications.PUBLICATIONS_FILE,
+                           os.path.join(scrape_publications.SHARDS_DIR, 'manifest.json')],
+                          run_publications))
+
+    producers = {}
+    for filename, slug in zip(exports, export_slugs(exports, state, digests)):
+        if not slug:
+            continue
+        def run_markdown(filename=filename, slug=slug):
+            written = markdownify.process_file(filename, cache=asset_cache, slug=slug, output_dir=BLOG_DIR,
+                                               incremental=True)
+            if asset_cache is not None:
+                markdownify.save_asset_cache(asset_cache)
+            return written is not None
+        producers[slug] = f"markdown:{slug}"
+        # Every conversion saves the shared asset cache index, so they take turns
+        nodes.append(node(producers[slug], [filename, markdownify.__file__], {'slug': slug},
+                          [os.path.join(BLOG_DIR, slug, 'blog.md')], run_markdown, lock='asset-cache',
+                          editable=True))
+
+    slugs = set(producers)
+    if os.path.isdir(BLOG_DIR):
+        slugs.update(e.name for e in os.scandir(BLOG_DIR) if e.is_dir())
+    for slug in sorted(slugs):
+        seed = regenerate_icons.cover_seed(slug)
+        target = os.path.join(BLOG_DIR, slug, "blog.svg")
+        def run_cover(slug=slug, seed=seed, target=target):
+            regenerate_icons.generate_blog_cover(seed=seed, filename=target, unique_id=slug,
+                                                 **regenerate_icons.COVER_CONFIG)
+            return True
+        nodes.append(node(f"cover:{slug}", [regenerate_icons.__file__, gen.__file__],
+                          {'slug': slug, 'seed': seed, 'generator': gen.GENERATOR_VERSION,
+                           'config': regenerate_icons.COVER_CONFIG},
+                          [target], run_cover, deps=[producers[slug]] if slug in producers else []))
+    return nodes
+
+# --- SCHEDULER ---
+
+def run_graph(nodes, state, digests, jobs=BUILD_WORKERS, force=False, dry_run=False):
+    """
+    Runs the stale nodes. A node is checked once its dependencies are done
+    (they may have rewritten its inputs); nodes depending on a failed one are
+    blocked. Updates state in place. Returns {name: {'status', 'reason', 'seconds'}}.
+    """
+    by_name = {n['name']: n for n in nodes}
+    locks = {n['lock']: threading.Lock() for n in nodes if n['lock']}
+    results = {}
+
+    def execute(n):
+        key = input_key(n, digests)
+        record = state['nodes'].get(n['name'])
+        if n['editable'] and not force:
+            outcome = hand_edit_outcome(n, record, key, digests)
+            if outcome:
+                status, reason, record = outcome
+                return {'status': status, 'reason': reason, 'seconds': 0.0}, None if dry_run else record
+        reason = "forced" if force else stale_reason(n, record, key, digests)
+        if reason is None:
+            return {'status': "fresh", 'reason': None, 'seconds': 0.0}, None
+        if dry_run:
+            return {'status': "stale", 'reason': reason, 'seconds': 0.0}, None
+        start = time.perf_counter()
+        lock = locks.get(n['lock'])
+        try:
+            with instrumentation.stage(n['name'].split(':')[0]):
+                if lock:
+                    with lock:
+                        ok = n['run']()
+                else:
+                    ok = n['run']()
+        except Exception as e:
+            print(f"Error building {n['name']}: {e}")
+            ok = False
+        seconds = time.perf_counter() - start
+        if not ok:
+            return {'status': "failed", 'reason': reason, 'seconds': seconds}, None
+        record = {'key': input_key(n, digests), 'outputs': {p: digests.digest(p) for p in n['outputs']
+                                                            if os.path.exists(p)}}
+        return {'status': "built", 'reason': reason, 'seconds': seconds}, record
+
+    pending = dict(by_name)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name, n in list(pending.items()):
+                deps = [results.get(d) for d in n['deps'] if d in by_name]
+                if any(r and r['status'] in ("failed", "blocked") for r in deps):
+                    results[name] = {'status': "blocked", 'reason': "a dependency failed", 'seconds': 0.0}
+                    del pending[name]
+                elif all(deps):
+                    running[pool.submit(execute, n)] = name
+                    del pending[name]
+            if not running:
+                # Only a dependency cycle leaves nodes waiting with nothing running
+                for name in pending:
+                    results[name] = {'status': "blocked", 'reason': "dependency cycle", 'seconds': 0.0}
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                results[name], record = future.result()
+                if record:
+                    state['nodes'][name] = record
+    return results
+
+def sync_cover_manifest(results, state):
+    """ Records covers built here in regenerate_icons' manifest, so --batch doesn't redo them. """
+    built = [name.split(':', 1)[1] for name, r in results.items()
+             if name.startswith('cover:') and r['status'] == "built"]
+    if not built:
+        return
+    manifest = regenerate_icons.load_manifest()
+    for slug in built:
+        target = os.path.join(BLOG_DIR, slug, "blog.svg")
+        key = regenerate_icons.cover_key(slug, regenerate_icons.cover_seed(slug), regenerate_icons.COVER_CONFIG)
+        manifest[slug] = {'key': key, 'sha256': state['nodes'][f"cover:{slug}"]['outputs'][target]}
+    regenerate_icons.save_manifest(manifest)
+
+def build(args, state, digests, asset_cache=None, show_fresh=True):
+    """ Discovers inputs, builds the graph and runs it once. Returns the results. """
+    pages = scrape_publications.discover_pages(args.pages)
+    exports = [f for f in markdownify.collect_inputs(args.exports or markdownify.FILES) if os.path.exists(f)]
+    nodes = build_graph(pages, exports, state, digests, asset_cache)
+    if args.only:
+        nodes = [n for n in nodes if n['name'].split(':')[0] in args.only]
+    print(f"{len(nodes)} nodes ({len(pages)} pages, {len(exports)} exports)")
+
+    start = time.perf_counter()
+    results = run_graph(nodes, state, digests, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    if not args.dry_run:
+        sync_cover_manifest(results, state)
+        state['files'] = digests.known
+        save_state(state)
+
+    for n in nodes:
+        r = results[n['name']]
+        if show_fresh or r['status'] != "fresh":
+            print(f"  {r['status']:<7} {r['seconds']:6.2f}s  {n['name']}" + (f"  ({r['reason']})" if r['reason'] else ""))
+    counts = {}
+    for r in results.values():
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+    print(", ".join(f"{v} {k}" for k, v in sorted(counts.items())) + f" in {time.perf_counter() - start:.2f}s")
+    return results
+
+# --- WATCH MODE ---
+
+def watch_roots(args):
+    """
+    (directory, suffix, recursive) triples covering every input: the saved
+    pages' and exports' directories (non-recursive) and the whole blog tree.
+    """
+    roots = {(BLOG_DIR, None, True)}
+    for paths, suffix in ((args.pages, '.html'), (args.exports or markdownify.FILES, '.json')):
+        for path in paths or ['.']:
+            directory = path if os.path.isdir(path) else os.path.dirname(path) or '.'
+            roots.add((os.path.normpath(directory), suffix, False))
+    return sorted(roots, key=lambda r: (r[0], r[1] or ''))
+
+def snapshot(roots):
+    """ {path: (size, mtime_ns)} of the watched files; hidden and temporary files are ignored. """
+    files = {}
+    for directory, suffix, recursive in roots:
+        if not os.path.isdir(directory):
+            continue
+        walk = os.walk(directory) if recursive else [(directory, [], os.listdir(directory))]
+        for folder, subdirs, names in walk:
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+            for name in names:
+                if name.startswith('.') or name.endswith(('.tmp', '.part')):
+                    continue
+                if suffix and not name.endswith(suffix):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (st.st_size, st.st_mtime_ns)
+    return files
+
+def changed_paths(before, after):
+    return sorted(p for p in before.keys() | after.keys() if before.get(p) != after.get(p))
+
+def is_hand_edit(path, before, after):
+    """ An author saving an existing post: nothing to rebuild (see hand_edit_outcome). """
+    return (path.startswith(BLOG_DIR + os.sep) and os.path.basename(path) == 'blog.md'
+            and path in before and path in after)
+
+def watch(args, state, digests):
+    """ Rebuilds after every (debounced) change to the watched inputs, until interrupted. """
+    roots = watch_roots(args)
+    asset_cache = markdownify.load_asset_cache()
+    print("Watching " + ", ".join(d + ("/" if recursive else f"/*{suffix}") for d, suffix, recursive in roots)
+          + " (Ctrl-C to stop)")
+    build(args, state, digests, asset_cache, show_fresh=False)
+    seen = snapshot(roots)
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            current = snapshot(roots)
+            if current == seen:
+                continue
+            quiet_since = time.monotonic()
+            while time.monotonic() - quiet_since < WATCH_DEBOUNCE:
+                time.sleep(WATCH_INTERVAL)
+                latest = snapshot(roots)
+                if latest != current:
+                    current, quiet_since = latest, time.monotonic()
+            changed = changed_paths(seen, current)
+            if all(is_hand_edit(path, seen, current) for path in changed):
+                print("\nEdited by hand, left as is: " + ", ".join(changed))
+                seen = current
+                continue
+            print(f"\n{len(changed)} changed: " + ", ".join(changed[:5]) + (" ..." if len(changed) > 5 else ""))
+            try:
+                build(args, state, digests, asset_cache, show_fresh=False)
+            except Exception as e:
+                print(f"Build failed: {e}")
+            # The build's own writes (under BLOG_DIR) are the new baseline. Pages
+            # or exports that changed while it ran are left marked as changed,
+            # so they trigger another round.
+            seen = snapshot(roots)
+            for path in changed_paths(current, seen):
+                if not path.startswith(BLOG_DIR + os.sep):
+                    if path in current:
+                        seen[path] = current[path]
+                    else:
+                        seen.pop(path, None)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild publications, blog markdown and covers, running only stale steps.")
+    parser.add_argument('--pages', nargs='*', default=None,
+                        help="saved publication pages (default: discovered as scrape_publications does)")
+    parser.add_argument('--exports', nargs='*', default=None,
+                        help="Reducto results, globs or directories (default: markdownify's FILES that exist)")
+    parser.add_argument('--only', choices=['publications', 'markdown', 'cover'], action='append',
+                        help="build only these kinds of node (repeatable)")
+    parser.add_argument('-j', '--jobs', type=int, default=BUILD_WORKERS, help="nodes run at once")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild every node, overwriting hand-edited posts")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="list stale nodes and why, without building")
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help="keep running and rebuild whatever a change to the inputs makes stale")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.start(args)
+
+    state = load_state()
+    digests = _FileDigests(state['files'])
+    if args.watch:
+        if args.dry_run or args.force:
+            parser.error("--watch can't be combined with --dry-run or --force")
+        watch(args, state, digests)
+        instrumentation.finish(args)
+        return
+
+    results = build(args, state, digests)
+    instrumentation.finish(args)
+    if any(r['status'] in ("failed", "blocked") for r in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+import instrumentation
+from scrape_publications import PUBLICATIONS_FILE, get_year, write_if_changed, write_shards
+
+# Link checks and arXiv lookups share one pooled session; at most
+# ENRICH_WORKERS requests are in flight at once.
+ENRICH_WORKERS = 8
+REQUEST_TIMEOUT = 10
+
+# Minimum seconds between two requests to the same host. arXiv asks API
+# clients for one request every 3 seconds.
+HOST_INTERVALS = {'export.arxiv.org': 3.0}
+DEFAULT_HOST_INTERVAL = 0.2
+
+ARXIV_API = "https://export.arxiv.org/api/query"
+ARXIV_BATCH = 50
+# IDs in the links ARXIV_LINK (scrape_publications) pulls out of entries
+ARXIV_ID = re.compile(r'arxiv\.org/abs/(\d{4}\.\d{4,5})(?:v\d+)?')
+ATOM = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
+
+PLACEHOLDER_VENUE = "CBMM Publication"
+
+# On-disk response cache. Entries expire after a TTL that depends on what
+# came back: working links and arXiv metadata rarely change, broken links may
+# be fixed, and errors (timeouts, 429, 5xx) are most likely transient.
+ENRICH_CACHE_FILE = ".enrich-cache.json"
+ENRICH_CACHE_VERSION = 1
+TTL = {'ok': 7 * 86400, 'broken': 86400, 'error': 3600, 'arxiv': 30 * 86400}
+
+def make_session(pool_size=ENRICH_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = "poggio-lab-site publication checker"
+    return session
+
+class _HostLimiter:
+    """ Spaces requests to each host at least its interval apart, across threads. """
+    def __init__(self, intervals=None, default=DEFAULT_HOST_INTERVAL):
+        self.intervals = HOST_INTERVALS if intervals is None else intervals
+        self.default = default
+        self.next = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next.get(host, now))
+            self.next[host] = slot + self.intervals.get(host, self.default)
+            self.requests += 1
+        if slot > now:
+            time.sleep(slot - now)
+
+# --- CACHE ---
+
+def load_cache(path=ENRICH_CACHE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get('version') != ENRICH_CACHE_VERSION:
+        cache = {'version': ENRICH_CACHE_VERSION}
+    cache.setdefault('links', {})
+    cache.setdefault('arxiv', {})
+    return cache
+
+def save_cache(cache, path=ENRICH_CACHE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def is_fresh(entry, now):
+    return bool(entry) and now - entry['time'] < TTL[entry['state']]
+
+# --- REQUESTS ---
+
+def check_link(session, limiter, url):
+    """
+    Cache entry for one link. HEAD first, following redirects; servers that
+    refuse HEAD get a streamed GET whose body is never read.
+    """
+    status, final_url, error = None, url, None
+    try:
+        for method in ('HEAD', 'GET'):
+            limiter.wait(url)
+            with session.request(method, url, timeout=REQUEST_TIMEOUT, allow_redirects=True,
+                                 stream=True) as response:
+                status, final_url = response.status_code, response.url
+            if status not in (403, 405, 501):
+                break
+    except requests.RequestException as e:
+        error = str(e)
+
+    if status is None or status == 429 or status >= 500:
+        state = 'error'
+    else:
+        state = 'ok' if status < 400 else 'broken'
+    entry = {'time': time.time(), 'state': state, 'status': status}
+    if final_url != url:
+        entry['final_url'] = final_url
+    if error:
+        entry['error'] = error
+    return url, entry
+
+def fetch_arxiv(session, limiter, ids, api=ARXIV_API):
+    """
+    arXiv metadata for a batch of IDs from the export API: {id: entry} with the
+    year first published and the journal reference, if any. IDs the API
+    doesn't know get an entry with found False. An unreachable API returns {}.
+    """
+    url = f"{api}?id_list={','.join(ids)}&max_results={len(ids)}"
+    try:
+        limiter.wait(url)
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        feed = ET.fromstring(response.content)
+    except (requests.RequestException, ET.ParseError) as e:
+        print(f"  arXiv lookup failed: {e}")
+        return {}
+
+    now = time.time()
+    found = {}
+    for item in feed.findall('atom:entry', ATOM):
+        match = ARXIV_ID.search(item.findtext('atom:id', '', ATOM))
+        if not match:
+            continue
+        published = item.findtext('atom:published', '', ATOM)
+        journal_ref = item.findtext('arxiv:journal_ref', '', ATOM)
+        found[match.group(1)] = {'time': now, 'state': 'arxiv', 'found': True,
+                                 'year': published[:4] or None,
+                                 'journal_ref': " ".join(journal_ref.split()) or None}
+    return {i: found.get(i, {'time': now, 'state': 'arxiv', 'found': False}) for i in ids}
+
+# --- ENRICHMENT ---
+
+def enrich(pubs, cache, session=None, limiter=None, workers=ENRICH_WORKERS, api=ARXIV_API, now=None):
+    """
+    Checks links and fills in missing years / placeholder venues from arXiv.
+
+    Links with an arXiv ID are confirmed by the API lookup (batched); every
+    other link gets a HEAD / GET. Only entries missing from the cache or past
+    their TTL cause requests; cache is updated in place.
+
+    Returns (publications, report): copies of pubs with years and venues
+    filled in, and counts plus the list of broken links.
+    """
+    now = time.time() if now is None else now
+    session = session or make_session(workers)
+    limiter = limiter or _HostLimiter()
+
+    ids = {}
+    links = []
+    for pub in pubs:
+        link = pub.get('link') or ""
+        match = ARXIV_ID.search(link)
+        if match:
+            ids[id(pub)] = match.group(1)
+        elif link.startswith(('http://', 'https://')) and link not in links:
+            links.append(link)
+
+    stale_ids = sorted({i for i in ids.values() if not is_fresh(cache['arxiv'].get(i), now)})
+    stale_links = [url for url in links if not is_fresh(cache['links'].get(url), now)]
+    requested = len(stale_links) + len(stale_ids)
+    instrumentation.count('links checked', len(stale_links))
+    instrumentation.count('arXiv IDs looked up', len(stale_ids))
+    if requested:
+        print(f"Checking {len(stale_links)} links and {len(stale_ids)} arXiv IDs "
+              f"({len(links) + len(set(ids.values())) - requested} cached)...")
+
+    batches = [stale_ids[i:i + ARXIV_BATCH] for i in range(0, len(stale_ids), ARXIV_BATCH)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        arxiv_futures = [pool.submit(fetch_arxiv, session, limiter, batch, api) for batch in batches]
+        for url, entry in pool.map(lambda url: check_link(session, limiter, url), stale_links):
+            cache['links'][url] = entry
+        for future in arxiv_futures:
+            cache['arxiv'].update(future.result())
+
+    report = {'links': len(links), 'arxiv': len(set(ids.values())), 'requests': requested,
+              'years_filled': 0, 'venues_filled': 0, 'broken': [], 'unknown_arxiv': []}
+    enriched = []
+    for pub in pubs:
+        arxiv_id = ids.get(id(pub))
+        pub = dict(pub)
+        if arxiv_id:
+            meta = cache['arxiv'].get(arxiv_id)
+            if meta and not meta['found']:
+                report['unknown_arxiv'].append({'title': pub['title'], 'link': pub['link']})
+            elif meta:
+                if not pub.get('year') and meta['year']:
+                    pub['year'] = meta['year']
+                    report['years_filled'] += 1
+                if pub.get('venue') in ("", None, PLACEHOLDER_VENUE):
+                    pub['venue'] = meta['journal_ref'] or f"arXiv:{arxiv_id}"
+                    report['venues_filled'] += 1
+        else:
+            entry = cache['links'].get(pub.get('link'))
+            if entry and entry['state'] == 'broken':
+                report['broken'].append({'title': pub['title'], 'link': pub['link'], 'status': entry['status']})
+        enriched.append(pub)
+    return enriched, report
+
+def print_report(report):
+    print(f"{report['links']} links, {report['arxiv']} arXiv IDs, {report['requests']} requests; "
+          f"filled {report['years_filled']} years and {report['venues_filled']} venues")
+    for item in report['broken']:
+        print(f"  broken ({item['status']}): {item['link']}  {item['title'][:60]!r}")
+    for item in report['unknown_arxiv']:
+        print(f"  unknown arXiv ID: {item['link']}  {item['title'][:60]!r}")
+
+# --- SELF TEST ---
+
+STUB_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <entry>
+    <id>http://arxiv.org/abs/2101.00001v2</id>
+    <published>2021-01-01T00:00:00Z</published>
+    <arxiv:journal_ref>Neural Computation 33 (2021)</arxiv:journal_ref>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/1905.12345v1</id>
+    <published>2019-05-29T00:00:00Z</published>
+  </entry>
+</feed>"""
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """ Local stand-in for CBMM and the arXiv API; counts requests per path. """
+    hits = {}
+
+    def respond(self, body):
+        path = urlsplit(self.path).path
+        self.hits[path] = self.hits.get(path, 0) + 1
+        if path == '/api/query':
+            status, payload = 200, STUB_FEED.encode('utf-8')
+        elif path == '/ok.pdf':
+            status, payload = 200, b"%PDF-1.4"
+        elif path == '/no-head.pdf':
+            status, payload = (405 if self.command == 'HEAD' else 200), b"%PDF-1.4"
+        elif path == '/moved.pdf':
+            self.send_response(301)
+            self.send_header('Location', '/ok.pdf')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        else:
+            status, payload = 404, b"not found"
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if body:
+            self.wfile.write(payload)
+
+    def do_HEAD(self):
+        self.respond(False)
+
+    def do_GET(self):
+        self.respond(True)
+
+    def log_message(self, *args):
+        pass
+
+def self_test():
+    """
+    Runs enrich() twice against a local stub server: the first run must
+    classify every link and fill arXiv metadata, the second must be served
+    entirely from the cache. Returns True if both behave.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    pubs = [
+        {'title': "Fine", 'authors': "A", 'venue': "Nature", 'year': "2020", 'link': f"{base}/ok.pdf"},
+        {'title': "No HEAD", 'authors': "B", 'venue': "Science", 'year': "2018", 'link': f"{base}/no-head.pdf"},
+        {'title': "Moved", 'authors': "C", 'venue': "Cell", 'year': "2017", 'link': f"{base}/moved.pdf"},
+        {'title': "Gone", 'authors': "D", 'venue': "PNAS", 'year': "2016", 'link': f"{base}/gone.pdf"},
+        {'title': "Journal", 'authors': "E", 'venue': PLACEHOLDER_VENUE, 'year': "", 'link': "https://arxiv.org/abs/2101.00001"},
+        {'title': "Preprint", 'authors': "F", 'venue': PLACEHOLDER_VENUE, 'year': "2019", 'link': "https://arxiv.org/abs/1905.12345v1"},
+        {'title': "Unknown", 'authors': "G", 'venue': "", 'year': "", 'link': "https://arxiv.org/abs/9999.99999"},
+    ]
+    limiter = _HostLimiter(intervals={}, default=0.05)
+    cache = load_cache(os.devnull)
+    try:
+        start = time.monotonic()
+        first, report = enrich(pubs, cache, limiter=limiter, api=f"{base}/api/query")
+        elapsed = time.monotonic() - start
+        hits = dict(_StubHandler.hits)
+        second, again = enrich(pubs, cache, limiter=limiter, api=f"{base}/api/query")
+    finally:
+        server.shutdown()
+
+    checks = {
+        "broken link found": [b['link'] for b in report['broken']] == [f"{base}/gone.pdf"],
+        "HEAD refusal falls back to GET": cache['links'][f"{base}/no-head.pdf"]['state'] == 'ok',
+        "redirect followed": cache['links'][f"{base}/moved.pdf"].get('final_url') == f"{base}/ok.pdf",
+        "year filled": first[4]['year'] == "2021" and report['years_filled'] == 1,
+        "venues filled": [p['venue'] for p in first[4:6]] == ["Neural Computation 33 (2021)", "arXiv:1905.12345"],
+        "unknown arXiv ID reported": [u['title'] for u in report['unknown_arxiv']] == ["Unknown"],
+        "one batched arXiv request": hits.get('/api/query') == 1,
+        "per-host rate limit": elapsed >= 0.05 * (limiter.requests - 1),
+        "second run fully cached": again['requests'] == 0 and _StubHandler.hits == hits and second == first,
+    }
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    return all(checks.values())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check publication links and fill missing years / venues from arXiv.")
+    parser.add_argument('--file', default=PUBLICATIONS_FILE, help=f"publications to enrich (default: {PUBLICATIONS_FILE})")
+    parser.add_argument('-j', '--workers', type=int, default=ENRICH_WORKERS, help="concurrent requests")
+    parser.add_argument('--arxiv-api', default=ARXIV_API, help="arXiv export API endpoint")
+    parser.add_argument('--refresh', action='store_true', help="ignore cached responses")
+    parser.add_argument('--report', metavar='JSON', help="write the broken / unknown link report here")
+    parser.add_argument('--self-test', action='store_true', help="run against a local stub server and exit")
+    args = parser.parse_args(argv)
+
+    if args.self_test:
+        ok = self_test()
+        print("Self-test passed." if ok else "Self-test failed.")
+        sys.exit(0 if ok else 1)
+
+    with open(args.file, 'r', encoding='utf-8') as f:
+        pubs = json.load(f)
+    cache = load_cache()
+    if args.refresh:
+        cache['links'], cache['arxiv'] = {}, {}
+    enriched, report = enrich(pubs, cache, workers=args.workers, api=args.arxiv_api)
+    save_cache(cache)
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    # Filled-in years can move entries; the sort is stable otherwise
+    enriched.sort(key=get_year, reverse=True)
+    if write_if_changed(args.file, json.dumps(enriched, indent=2)):
+        print(f"Wrote {len(enriched)} publications to {args.file}")
+        if args.file == PUBLICATIONS_FILE:
+            write_shards(enriched)
+    else:
+        print(f"{args.file} unchanged")
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,46 @@ import random
 import math
 import time
 
+import numpy as np
+
+import instrumentation
+
 # --- CONFIGURATION ---
+# Bump whenever a change alters the output for a given seed, so that
+# cached covers (see regenerate_icons.py --batch) get rebuilt.
+GENERATOR_VERSION = "2"
+
 WIDTH = 1200
 HEIGHT = 630
 BG_COLOR = "#FFFFFF"     # Pure white background
 TRIANGLE_SIZE = 45       # Slightly larger for a cleaner, less "noisy" look
 
+# Named output formats. Layout sizes (stripe widths, circle radii, ...) are tuned
+# for 1200x630 and scale with the canvas; max_triangles caps mesh density by
+# growing the triangle size until the mesh fits.
+PRESETS = {
+    'og-card':   {'width': 1200, 'height': 630,  'triangle_size': 45},
+    'thumbnail': {'width': 400,  'height': 210,  'triangle_size': 24, 'max_triangles': 400},
+    'hero-4k':   {'width': 3840, 'height': 2160, 'triangle_size': 96, 'max_triangles': 12000},
+}
+
+def resolve_config(config=None):
+    """
+    Returns a fresh config dict (width, height, bg_color, triangle_size,
+    max_triangles, scale) from None (the module constants), a preset name or a
+    dict of overrides. Nothing is shared, so callers in different threads or
+    processes can't see each other's settings.
+    """
+    resolved = {'width': WIDTH, 'height': HEIGHT, 'bg_color': BG_COLOR,
+                'triangle_size': TRIANGLE_SIZE, 'max_triangles': None}
+    if isinstance(config, str):
+        if config not in PRESETS:
+            raise ValueError(f"Unknown preset {config!r}, expected one of {sorted(PRESETS)}")
+        config = PRESETS[config]
+    resolved.update({k: v for k, v in (config or {}).items() if k != 'scale'})
+    resolved['scale'] = min(resolved['width'] / 1200, resolved['height'] / 630)
+    return resolved
+
 # --- COLOR ENGINE ---
 
 def hsv_to_rgb_hex(h, s, v):
@@ -24,15 +58,16 @@ def hsv_to_rgb_hex(h, s, v):
     r, g, b = int((r + m) * 255), int((g + m) * 255), int((b + m) * 255)
     return f"#{r:02x}{g:02x}{b:02x}"
 
-def get_vibrant_color(x, y, grad_props, rng):
+def get_vibrant_color(x, y, grad_props, rng, config=None):
     """ Calculates vibrant color based on global position gradient. """
+    config = resolve_config(config)
     angle, h_start, h_end = grad_props
     dx, dy = math.cos(angle), math.sin(angle)
-    cx, cy = WIDTH / 2, HEIGHT / 2
+    cx, cy = config['width'] / 2, config['height'] / 2
     
     # Project onto gradient vector
     proj = (x - cx) * dx + (y - cy) * dy
-    max_dist = 800
+    max_dist = 800 * config['scale']
     t = (proj + max_dist) / (2 * max_dist)
     t = max(0.0, min(1.0, t))
     
@@ -50,23 +85,81 @@ def get_stripe_color(rng):
     v = rng.uniform(0.94, 0.98) # Very bright
     return hsv_to_rgb_hex(0, 0, v)
 
+# --- BATCHED COLOR ENGINE ---
+# Same math as above, applied to whole triangle arrays at once.
+
+HEX_BYTES = [f"{i:02x}" for i in range(256)]
+
+def random_batch(rng, n):
+    """
+    Draws n uniform [0, 1) floats as an array.
+    A random.Random is consumed in the same order as n scalar rng.random() calls.
+    """
+    if isinstance(rng, random.Random):
+        return np.array([rng.random() for _ in range(n)])
+    return rng.random(n)
+
+def hsv_to_rgb_batch(h, s, v):
+    """ Vectorized HSV to RGB, truncated to ints like hsv_to_rgb_hex. Returns an (N, 3) array. """
+    h, s, v = np.broadcast_arrays(np.asarray(h, dtype=float), np.asarray(s, dtype=float), np.asarray(v, dtype=float))
+    c = v * s
+    x = c * (1 - np.abs((h / 60) % 2 - 1))
+    m = v - c
+    zero = np.zeros_like(c)
+
+    # Same comparisons as the scalar if/elif ladder (h / 60 can round up to the next sector)
+    sector = (h >= 60).astype(np.intp) + (h >= 120) + (h >= 180) + (h >= 240) + (h >= 300)
+    r = np.choose(sector, [c, x, zero, zero, x, c])
+    g = np.choose(sector, [x, c, c, x, zero, zero])
+    b = np.choose(sector, [zero, zero, x, c, c, x])
+
+    rgb = (np.stack([r, g, b], axis=-1) + m[..., None]) * 255
+    return rgb.astype(np.intp).reshape(-1, 3)
+
+def hsv_to_rgb_hex_batch(h, s, v):
+    """ Vectorized hsv_to_rgb_hex. Returns a list of hex strings. """
+    return ["#" + HEX_BYTES[r] + HEX_BYTES[g] + HEX_BYTES[b] for r, g, b in hsv_to_rgb_batch(h, s, v).tolist()]
+
+def get_vibrant_colors(centroids, grad_props, rng, config=None, rgb=False):
+    """
+    Batched get_vibrant_color for a (T, 2) array of triangle centroids.
+    Returns hex strings, or a (T, 3) int array if rgb is set.
+    """
+    config = resolve_config(config)
+    angle, h_start, h_end = grad_props
+    dx, dy = math.cos(angle), math.sin(angle)
+    cx, cy = config['width'] / 2, config['height'] / 2
+    centroids = np.asarray(centroids, dtype=float)
+
+    # Project onto gradient vector
+    proj = (centroids[:, 0] - cx) * dx + (centroids[:, 1] - cy) * dy
+    max_dist = 800 * config['scale']
+    t = np.clip((proj + max_dist) / (2 * max_dist), 0.0, 1.0)
+
+    # Interpolate hue
+    h = h_start + (h_end - h_start) * t
+
+    # Vibrant Settings, drawn per triangle in (s, v, hue jitter) order
+    u = random_batch(rng, 3 * len(centroids)).reshape(-1, 3)
+    s = 0.65 + (u[:, 0] * 0.15)
+    v = 0.90 + (u[:, 1] * 0.10)
+    h += -10 + (10 - -10) * u[:, 2]
+    return (hsv_to_rgb_batch if rgb else hsv_to_rgb_hex_batch)(h % 360, s, v)
+
+def get_stripe_colors(n, rng, rgb=False):
+    """ Batched get_stripe_color for n triangles (hex strings, or (n, 3) ints if rgb is set). """
+    v = 0.94 + (0.98 - 0.94) * random_batch(rng, n)
+    return (hsv_to_rgb_batch if rgb else hsv_to_rgb_hex_batch)(0, 0, v)
+
 # --- GLOBAL MESH GENERATOR ---
 
-def generate_global_mesh(width, height, rng):
+def generate_global_mesh(width, height, rng, config=None):
     """
     Generates ONE single grid of triangles covering the whole canvas.
     This ensures that when we clip it later, everything aligns perfectly.
     """
     # Add padding so triangles don't disappear at edges
-    pad = 50
-    start_x, start_y = -pad, -pad
-    end_w, end_h = width + pad*2, height + pad*2
-    
-    cols = int(end_w / TRIANGLE_SIZE)
-    rows = int(end_h / TRIANGLE_SIZE)
-    
-    cell_w = end_w / cols
-    cell_h = end_h / rows
+    start_x, start_y, cols, rows, cell_w, cell_h = _mesh_grid(width, height, config)
     
     # Reduced jitter for a "cleaner" look
     jitter_x = cell_w * 0.30
@@ -110,15 +203,256 @@ def generate_global_mesh(width, height, rng):
                 
     return triangles
 
-# --- MAIN GENERATOR ---
+# --- VECTORIZED MESH GENERATOR ---
+
+def _mesh_grid(width, height, config=None):
+    """ Grid layout shared by both mesh generators. """
+    config = resolve_config(config)
+    pad = 50
+    start_x, start_y = -pad, -pad
+    end_w, end_h = width + pad*2, height + pad*2
+
+    size = config['triangle_size']
+    cols = max(1, int(end_w / size))
+    rows = max(1, int(end_h / size))
+
+    # Grow the cells until the mesh fits the preset's triangle budget
+    max_triangles = config.get('max_triangles')
+    while max_triangles and 2 * cols * rows > max_triangles and (cols > 1 or rows > 1):
+        size *= max(1.01, math.sqrt(2 * cols * rows / max_triangles))
+        cols = max(1, int(end_w / size))
+        rows = max(1, int(end_h / size))
+
+    cell_w = end_w / cols
+    cell_h = end_h / rows
+    return start_x, start_y, cols, rows, cell_w, cell_h
+
+def generate_mesh_arrays(width, height, rng, config=None):
+    """
+    NumPy version of generate_global_mesh.
+
+    Returns (vertices, triangles, centroids) as contiguous arrays:
+    vertices is (V, 2) float, triangles is (T, 3) int indices into vertices
+    and centroids is (T, 2) float.
+
+    If rng is a random.Random, the draws are taken from it in exactly the same
+    order as generate_global_mesh, so a given seed yields the same mesh (and
+    leaves rng in the same state). If rng is a numpy Generator, every draw is
+    batched instead.
+    """
+    start_x, start_y, cols, rows, cell_w, cell_h = _mesh_grid(width, height, config)
+    jitter_x = cell_w * 0.30
+    jitter_y = cell_h * 0.30
+
+    # 1. Generate Vertices (row-major, index = r * (cols + 1) + c)
+    c_idx = np.tile(np.arange(cols + 1), rows + 1)
+    r_idx = np.repeat(np.arange(rows + 1), cols + 1)
+    x_mask = (c_idx > 0) & (c_idx < cols)
+    y_mask = (r_idx > 0) & (r_idx < rows)
+
+    px = start_x + c_idx * cell_w
+    py = start_y + r_idx * cell_h
+
+    if isinstance(rng, random.Random):
+        # Compatibility path: replay the scalar draw order (x then y per vertex)
+        per_vertex = x_mask.astype(np.intp) + y_mask
+        n_jitter = int(per_vertex.sum())
+        draws = random_batch(rng, n_jitter + rows * cols)
+        first = np.cumsum(per_vertex) - per_vertex
+        ux = draws[first[x_mask]]
+        uy = draws[(first + x_mask)[y_mask]]
+        flips = draws[n_jitter:] < 0.5
+        # random.uniform(a, b) is a + (b - a) * random()
+        px[x_mask] += -jitter_x + (jitter_x - -jitter_x) * ux
+        py[y_mask] += -jitter_y + (jitter_y - -jitter_y) * uy
+    else:
+        px[x_mask] += rng.uniform(-jitter_x, jitter_x, int(x_mask.sum()))
+        py[y_mask] += rng.uniform(-jitter_y, jitter_y, int(y_mask.sum()))
+        flips = rng.random(rows * cols) < 0.5
+
+    vertices = np.ascontiguousarray(np.stack([px, py], axis=1))
+
+    # 2. Triangulate (two triangles per cell, in cell order)
+    cell = np.arange(rows * cols)
+    i00 = (cell // cols) * (cols + 1) + cell % cols
+    i10 = i00 + 1
+    i01 = i00 + cols + 1
+    i11 = i01 + 1
+
+    first_tri = np.where(flips[:, None], np.stack([i00, i10, i11], axis=1), np.stack([i00, i10, i01], axis=1))
+    second_tri = np.where(flips[:, None], np.stack([i00, i11, i01], axis=1), np.stack([i10, i11, i01], axis=1))
+    triangles = np.ascontiguousarray(np.stack([first_tri, second_tri], axis=1).reshape(-1, 3))
+
+    # Same summation order as the scalar version so centroids match bit for bit
+    corners = vertices[triangles]
+    centroids = np.ascontiguousarray((corners[:, 0] + corners[:, 1] + corners[:, 2]) / 3)
+
+    return vertices, triangles, centroids
+
+def mesh_arrays_to_triangles(vertices, triangles, centroids):
+    """ Converts generate_mesh_arrays output to the generate_global_mesh format. """
+    pts = [tuple(map(tuple, tri)) for tri in vertices[triangles].tolist()]
+    return [{'pts': p, 'cx': c[0], 'cy': c[1]} for p, c in zip(pts, centroids.tolist())]
+
+# --- COMPACT SVG GEOMETRY ---
+
+def svg_number(value, precision):
+    """ Shortest SVG form of a coordinate: no trailing zeros, no leading zero. """
+    s = f"{value:.{precision}f}"
+    if precision:
+        s = s.rstrip('0').rstrip('.')
+    if s.startswith('0.'): s = s[1:]
+    elif s.startswith('-0.'): s = '-' + s[2:]
+    return '0' if s in ('', '-0') else s
+
+def svg_join_numbers(numbers):
+    """ Joins numbers with the minimal separators SVG path syntax allows. """
+    out = numbers[0]
+    for n in numbers[1:]:
+        out += n if n[0] == '-' or (n[0] == '.' and '.' in out.rsplit(' ', 1)[-1].rsplit('-', 1)[-1]) else ' ' + n
+    return out
+
+def triangle_path_data(vertices, triangles, precision=1):
+    """
+    Relative path data ("M x y l dx1 dy1 dx2 dy2z") for every triangle.
+    Coordinates are rounded to `precision` decimals before differencing, so
+    rounding errors don't accumulate along a triangle.
+    """
+    corners = np.round(vertices[triangles], precision) + 0.0  # + 0.0 drops negative zeros
+    deltas = np.round(corners[:, 1:] - corners[:, :-1], precision) + 0.0
+    paths = []
+    for (x0, y0), (d1, d2) in zip(corners[:, 0].tolist(), deltas.reshape(-1, 2, 2).tolist()):
+        move = svg_join_numbers([svg_number(x0, precision), svg_number(y0, precision)])
+        line = svg_join_numbers([svg_number(v, precision) for v in (*d1, *d2)])
+        paths.append(f"M{move}l{line}z")
+    return paths
+
+# --- CULLING ---
+# Each render pass only shows the mesh through a small window: the stripe clip
+# or the circle mask. Triangles entirely outside a pass's window are left out
+# of that pass. Their colors are still drawn, so the rng order, and with it
+# every visible pixel, stays the same. The windows are padded by CULL_PAD
+# pixels of the cover as displayed CULL_MIN_WIDTH wide, which covers the
+# stroke and the anti-aliasing of the clip and mask edges down to that size.
+CULL_CELL = 64
+CULL_PAD = 2
+CULL_MIN_WIDTH = 100
+
+def triangle_grid(corners, cell):
+    """
+    Uniform grid over the triangles' bounding boxes, as (cells, ids, bounds):
+    cells is a (K, 2) array of the (col, row) cells some bounding box overlaps,
+    ids[bounds[k]:bounds[k + 1]] the triangles overlapping cells[k].
+    """
+    lo = np.floor(corners.min(axis=1) / cell).astype(np.intp)
+    hi = np.floor(corners.max(axis=1) / cell).astype(np.intp)
+    ids = np.arange(len(corners))
+    entries = []
+    for dc in range(int((hi - lo)[:, 0].max(initial=0)) + 1):
+        for dr in range(int((hi - lo)[:, 1].max(initial=0)) + 1):
+            hit = (lo[:, 0] + dc <= hi[:, 0]) & (lo[:, 1] + dr <= hi[:, 1])
+            entries.append(np.column_stack([lo[hit, 0] + dc, lo[hit, 1] + dr, ids[hit]]))
+    entries = np.concatenate(entries) if entries else np.empty((0, 3), dtype=np.intp)
+    entries = entries[np.lexsort((entries[:, 1], entries[:, 0]))]
+    cells, starts = np.unique(entries[:, :2], axis=0, return_index=True)
+    return cells, entries[:, 2], np.append(starts, len(entries))
+
+def grid_candidates(grid, cell, cell_test):
+    """
+    Ids of the triangles in the cells that pass cell_test(x0, y0, x1, y1),
+    which gets the bounds of all cells as arrays.
+    """
+    cells, ids, bounds = grid
+    x0, y0 = cells[:, 0] * cell, cells[:, 1] * cell
+    passed = np.flatnonzero(cell_test(x0, y0, x0 + cell, y0 + cell)).tolist()
+    if not passed:
+        return np.empty(0, dtype=np.intp)
+    return np.unique(np.concatenate([ids[bounds[k]:bounds[k + 1]] for k in passed]))
+
+def point_triangle_distance(corners, px, py):
+    """ Distance from (px, py) to each triangle in corners (T, 3, 2); 0 inside. """
+    p = np.array([px, py])
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    def side(o, q):
+        return (q[:, 0] - o[:, 0]) * (py - o[:, 1]) - (q[:, 1] - o[:, 1]) * (px - o[:, 0])
+    def segment(o, q):
+        d = q - o
+        t = np.clip(((p - o) * d).sum(axis=1) / np.maximum((d * d).sum(axis=1), 1e-12), 0, 1)
+        return np.hypot(*(o + t[:, None] * d - p).T)
+    s1, s2, s3 = side(a, b), side(b, c), side(c, a)
+    inside = ((s1 >= 0) & (s2 >= 0) & (s3 >= 0)) | ((s1 <= 0) & (s2 <= 0) & (s3 <= 0))
+    return np.where(inside, 0.0, np.minimum(np.minimum(segment(a, b), segment(b, c)), segment(c, a)))
+
+def rect_distances(x0, y0, x1, y1, px, py):
+    """ Nearest and farthest distance from (px, py) to each rectangle. """
+    near = np.hypot(np.maximum(np.maximum(x0 - px, px - x1), 0), np.maximum(np.maximum(y0 - py, py - y1), 0))
+    far = np.hypot(np.maximum(px - x0, x1 - px), np.maximum(py - y0, y1 - py))
+    return near, far
+
+def cull_mesh(corners, layout, config):
+    """
+    Which triangles (corners: (T, 3, 2)) each pass has to draw, as two bool
+    arrays (stripes, circles). Candidates come from a uniform grid over the
+    triangles' bounding boxes and are then tested exactly:
+
+    - stripes: the triangle's extent across the rotated stripes overlaps one
+    - hero circle: the triangle comes within r of its center
+    - satellites: the triangle touches the ring a satellite sweeps when the
+      orbit group rotates about the canvas center
+    """
+    width, height = config['width'], config['height']
+    cell, pad = CULL_CELL * config['scale'], CULL_PAD * width / CULL_MIN_WIDTH
+    grid = triangle_grid(corners, cell)
+    cx, cy = width / 2, height / 2
+
+    # Distance across the stripes, as in stripe_clip_mask
+    angle = math.radians(layout['stripe_rotation'])
+    sin, cos = math.sin(angle), math.cos(angle)
+    across = lambda x, y: cy - (x - cx) * sin + (y - cy) * cos
+    u = across(corners[:, :, 0], corners[:, :, 1])
+    u_lo, u_hi = u.min(axis=1), u.max(axis=1)
+    stripes = np.zeros(len(corners), dtype=bool)
+    for s in layout['stripes']:
+        top, bottom = s['y'] - pad, s['y'] + s['h'] + pad
+        def overlaps(x0, y0, x1, y1):
+            cell_u = np.stack([across(x0, y0), across(x0, y1), across(x1, y0), across(x1, y1)])
+            return (cell_u.min(axis=0) <= bottom) & (cell_u.max(axis=0) >= top)
+        ids = grid_candidates(grid, cell, overlaps)
+        stripes[ids] |= (u_lo[ids] <= bottom) & (u_hi[ids] >= top)
+
+    circles = np.zeros(len(corners), dtype=bool)
+    hero = layout['hero_circle']
+    reach = hero['r'] + pad
+    ids = grid_candidates(grid, cell, lambda *rect: rect_distances(*rect, hero['x'], hero['y'])[0] <= reach)
+    circles[ids] |= point_triangle_distance(corners[ids], hero['x'], hero['y']) <= reach
+    for c in layout['orbit_circles']:
+        orbit = math.hypot(c['x'] - cx, c['y'] - cy)
+        inner, outer = orbit - c['r'] - pad, orbit + c['r'] + pad
+        def in_ring(*rect):
+            near, far = rect_distances(*rect, cx, cy)
+            return (near <= outer) & (far >= inner)
+        ids = grid_candidates(grid, cell, in_ring)
+        far = np.hypot(corners[ids, :, 0] - cx, corners[ids, :, 1] - cy).max(axis=1)
+        circles[ids] |= (point_triangle_distance(corners[ids], cx, cy) <= outer) & (far >= inner)
+    return stripes, circles
 
 # --- MAIN GENERATOR ---
 
+import io
+import os
+import sys
 import hashlib
 
-def generate_blog_cover(seed=None, filename="cover.svg", unique_id=None):
-    if seed is None: seed = int(time.time())
-    
+# Triangles per color batch when streaming; bounds the per-pass working set
+STREAM_CHUNK = 4096
+
+def iter_batches(fn, n, chunk=STREAM_CHUNK):
+    """ Yields fn(start, stop) results chunk by chunk, flattened. """
+    for start in range(0, n, chunk):
+        yield from fn(start, min(start + chunk, n))
+
+def cover_uid(seed, unique_id=None):
+    """ Short, stable id used to scope the cover's ids, classes and keyframes. """
     # Generate a short, stable unique ID if one wasn't properly provided or if it's long
     # If unique_id is the slug, we hash it to keep it short and consistent
     if unique_id is None: 
@@ -126,10 +460,67 @@ def generate_blog_cover(seed=None, filename="cover.svg", unique_id=None):
     
     # Create a stable, short alphanumeric ID from the unique_id (slug)
     # This avoids issues with extremely long IDs from long slugs
-    short_uid = hashlib.md5(str(unique_id).encode('utf-8')).hexdigest()[:8]
-    
-    print(f"Generating clean mesh with Seed: {seed}, UID: {short_uid}")
-    rng = random.Random(seed)
+    return hashlib.md5(str(unique_id).encode('utf-8')).hexdigest()[:8]
+
+def compact_mesh_passes(short_uid, vertices, triangles, precision, stripe_colors, vibrant_colors, clip_stripes_id, mask_circles_id,
+                        keep=None):
+    """
+    Both render passes for compact output. Each triangle is defined once in <defs>
+    and drawn with <use>; the use inherits its fill and stroke from `color`.
+    keep is the (stripes, circles) pair from cull_mesh; only triangles either
+    pass draws are defined, under their original index.
+    """
+    if keep is None:
+        keep = (np.ones(len(triangles), dtype=bool),) * 2
+    stripe_keep, circle_keep = keep
+    defined = np.flatnonzero(stripe_keep | circle_keep)
+    mesh_class = f"mesh-{short_uid}"
+    tri_id = lambda i: f"t{short_uid}-{i:x}"
+
+    yield '<style>'
+    yield f'.{mesh_class} {{ stroke-width: 1; stroke-linejoin: round; }}'
+    yield f'.{mesh_class} use {{ fill: currentColor; stroke: currentColor; }}'
+    yield '</style>'
+
+    yield '<defs>'
+    for start in range(0, len(defined), STREAM_CHUNK):
+        ids = defined[start:start + STREAM_CHUNK]
+        paths = triangle_path_data(vertices, triangles[ids], precision)
+        for i, d in zip(ids.tolist(), paths):
+            yield f'<path id="{tri_id(i)}" d="{d}"/>'
+    yield '</defs>'
+
+    # --- 4. RENDER PASS 1: STRIPES (Light Gray) ---
+    # Only a handful of distinct grays, so group the uses by color.
+    by_color = {}
+    for i, color in enumerate(stripe_colors):
+        if stripe_keep[i]:
+            by_color.setdefault(color, []).append(i)
+
+    yield f'<g clip-path="url(#{clip_stripes_id})" class="{mesh_class}">'
+    for color in sorted(by_color):
+        yield f'<g color="{color}">'
+        for i in by_color[color]:
+            yield f'<use href="#{tri_id(i)}"/>'
+        yield '</g>'
+    yield '</g>'
+
+    # --- 5. RENDER PASS 2: CIRCLES (Vibrant) ---
+    yield f'<g mask="url(#{mask_circles_id})" class="{mesh_class}">'
+    for i, color in enumerate(vibrant_colors):
+        if circle_keep[i]:
+            yield f'<use href="#{tri_id(i)}" color="{color}"/>'
+    yield '</g>'
+
+def cover_layout(rng, config):
+    """
+    Draws everything that precedes the mesh: the color gradient, the stripe
+    rectangles and the circles. Shared by the SVG and PNG renderers so the same
+    seed gives the same picture in both.
+    """
+    width, height = config['width'], config['height']
+    # Scale layout sizes tuned for 1200x630
+    scaled = lambda v: int(round(v * config['scale']))
     
     # 1. Setup Colors
     grad_angle = math.radians(rng.randint(0, 360))
@@ -137,111 +528,405 @@ def generate_blog_cover(seed=None, filename="cover.svg", unique_id=None):
     hue_end = hue_start + rng.choice([-80, -60, 60, 80])
     grad_props = (grad_angle, hue_start, hue_end)
     
-    svg = []
-    # Add unique ID to the top-level SVG
-    # Set width/height to 100% and use preserveAspectRatio="xMidYMid slice" to fill container
-    svg.append(f'<svg id="svg-{short_uid}" width="100%" height="100%" viewBox="0 0 {WIDTH} {HEIGHT}" preserveAspectRatio="xMidYMid slice" xmlns="http://www.w3.org/2000/svg">')
-    svg.append(f'<rect width="100%" height="100%" fill="{BG_COLOR}"/>')
-
-    # --- CSS ANIMATION ---
-    # Scope keyframes and class selectors to this specific SVG instance
-    anim_name = f"orbit-{short_uid}"
-    group_class = f"orbit-group-{short_uid}"
-    
-    svg.append('<style>')
-    svg.append(f'@keyframes {anim_name} {{ from {{ transform: rotate(0deg); }} to {{ transform: rotate(360deg); }} }}')
-    svg.append(f'.{group_class} {{ transform-origin: {WIDTH/2}px {HEIGHT/2}px; }}')
-    # Scope hover trigger to this specific SVG's ID
-    # svg.append(f'#svg-{short_uid}:hover .{group_class} {{ animation: {anim_name} 20s linear infinite; }}')
-    svg.append('</style>')
-    
-    # --- 2. DEFINE SHAPES (CLIPPING MASKS) ---
-    svg.append('<defs>')
-    
     # Group A: The Stripes (Rotated Rectangles)
     stripe_rotation = rng.randint(0, 360)
     num_stripes = rng.randint(3, 5)
-    diag = math.hypot(WIDTH, HEIGHT) * 1.5
-    
-    # Scope clip paths as well
-    clip_stripes_id = f"clip_stripes_{short_uid}"
-    mask_circles_id = f"mask_circles_{short_uid}"
+    diag = math.hypot(width, height) * 1.5
     
-    svg.append(f'<clipPath id="{clip_stripes_id}">')
+    stripes = []
     for i in range(num_stripes):
-        sh = rng.randint(25, 55) # Thin lines
-        offset = rng.uniform(-HEIGHT/1.8, HEIGHT/1.8)
-        cx, cy = WIDTH/2, HEIGHT/2
-        svg.append(f'<rect x="{cx - diag/2}" y="{cy + offset - sh/2}" width="{diag}" height="{sh}" transform="rotate({stripe_rotation} {cx} {cy})" />')
-    svg.append('</clipPath>')
+        sh = rng.randint(scaled(25), scaled(55)) # Thin lines
+        offset = rng.uniform(-height/1.8, height/1.8)
+        cx, cy = width/2, height/2
+        stripes.append({'x': cx - diag/2, 'y': cy + offset - sh/2, 'w': diag, 'h': sh})
     
     # Group B: The Circles (MASK)
-    circles = []
     # Hero Circle (Static Center)
-    hero_circle = {'x': WIDTH/2 + rng.randint(-40,40), 'y': HEIGHT/2 + rng.randint(-20,20), 'r': rng.randint(220, 260)}
+    hero_circle = {'x': width/2 + rng.randint(-scaled(40),scaled(40)), 'y': height/2 + rng.randint(-scaled(20),scaled(20)), 'r': rng.randint(scaled(220), scaled(260))}
     
     # Satellites (Orbiting)
     orbit_circles = []
     for _ in range(10):
         if len(orbit_circles) > 5: break
-        r = rng.randint(50, 100)
-        x = rng.randint(r, WIDTH-r)
-        y = rng.randint(r, HEIGHT-r)
+        r = rng.randint(scaled(50), scaled(100))
+        x = rng.randint(r, width-r)
+        y = rng.randint(r, height-r)
         
         # Collision
         hit = False
-        if math.hypot(x-hero_circle['x'], y-hero_circle['y']) < (r + hero_circle['r'] + 30): hit = True
+        if math.hypot(x-hero_circle['x'], y-hero_circle['y']) < (r + hero_circle['r'] + scaled(30)): hit = True
         for c in orbit_circles:
-            if math.hypot(x-c['x'], y-c['y']) < (r + c['r'] + 30): hit = True; break
+            if math.hypot(x-c['x'], y-c['y']) < (r + c['r'] + scaled(30)): hit = True; break
         if not hit: orbit_circles.append({'x':x, 'y':y, 'r':r})
-            
-    svg.append(f'<mask id="{mask_circles_id}">')
+    
+    return {'grad_props': grad_props, 'stripe_rotation': stripe_rotation, 'stripes': stripes,
+            'hero_circle': hero_circle, 'orbit_circles': orbit_circles}
+
+def iter_blog_cover(seed=None, unique_id=None, engine="numpy", compact=False, precision=1, config=None, cull=True):
+    """
+    Yields the lines of one cover SVG, lazily. Colors are drawn batch by batch
+    as the passes are emitted, so memory beyond the mesh itself stays flat.
+
+    engine="numpy" builds the mesh with generate_mesh_arrays, engine="python"
+    with the original generate_global_mesh loops; both give the same file for
+    a given seed.
+
+    config is a preset name from PRESETS or a dict of overrides (see
+    resolve_config); the default uses the module constants.
+
+    compact=True writes the mesh geometry once in <defs> as relative paths with
+    `precision` decimals and reuses it from both passes via <use>, with stroke
+    and fill styling hoisted into a CSS class. Same seed, same picture, roughly
+    half the bytes.
+
+    cull=True leaves out of each pass the triangles its clip or mask hides
+    completely (see cull_mesh). The rendered picture does not change.
+    """
+    if compact and engine != "numpy":
+        raise ValueError("compact output requires engine='numpy'")
+    if seed is None: seed = int(time.time())
+    
+    short_uid = cover_uid(seed, unique_id)
+    rng = random.Random(seed)
+    config = resolve_config(config)
+    width, height = config['width'], config['height']
+    layout = cover_layout(rng, config)
+    grad_props = layout['grad_props']
+    hero_circle, orbit_circles = layout['hero_circle'], layout['orbit_circles']
+    
+    # Add unique ID to the top-level SVG
+    # Set width/height to 100% and use preserveAspectRatio="xMidYMid slice" to fill container
+    yield f'<svg id="svg-{short_uid}" width="100%" height="100%" viewBox="0 0 {width} {height}" preserveAspectRatio="xMidYMid slice" xmlns="http://www.w3.org/2000/svg">'
+    yield f'<rect width="100%" height="100%" fill="{config["bg_color"]}"/>'
+
+    # --- CSS ANIMATION ---
+    # Scope keyframes and class selectors to this specific SVG instance
+    anim_name = f"orbit-{short_uid}"
+    group_class = f"orbit-group-{short_uid}"
+    
+    yield '<style>'
+    yield f'@keyframes {anim_name} {{ from {{ transform: rotate(0deg); }} to {{ transform: rotate(360deg); }} }}'
+    yield f'.{group_class} {{ transform-origin: {width/2}px {height/2}px; }}'
+    # Scope hover trigger to this specific SVG's ID
+    # yield f'#svg-{short_uid}:hover .{group_class} {{ animation: {anim_name} 20s linear infinite; }}'
+    yield '</style>'
+    
+    # --- 2. DEFINE SHAPES (CLIPPING MASKS) ---
+    yield '<defs>'
+    
+    # Scope clip paths as well
+    clip_stripes_id = f"clip_stripes_{short_uid}"
+    mask_circles_id = f"mask_circles_{short_uid}"
+    
+    # Group A: The Stripes (Rotated Rectangles)
+    yield f'<clipPath id="{clip_stripes_id}">'
+    cx, cy = width/2, height/2
+    for s in layout['stripes']:
+        yield f'<rect x="{s["x"]}" y="{s["y"]}" width="{s["w"]}" height="{s["h"]}" transform="rotate({layout["stripe_rotation"]} {cx} {cy})" />'
+    yield '</clipPath>'
+    
+    # Group B: The Circles (MASK)
+    yield f'<mask id="{mask_circles_id}">'
     # 1. Start with black (hidden)
-    svg.append(f'<rect width="100%" height="100%" fill="black" />')
+    yield f'<rect width="100%" height="100%" fill="black" />'
     
     # 2. Add White Circles (Visible)
     # Hero circle is static (outside the orbit group)
-    svg.append(f'<circle cx="{hero_circle["x"]}" cy="{hero_circle["y"]}" r="{hero_circle["r"]}" fill="white" />')
+    yield f'<circle cx="{hero_circle["x"]}" cy="{hero_circle["y"]}" r="{hero_circle["r"]}" fill="white" />'
     
     # Orbiting satellites
     # Added helper class usually accessible via DOM
-    svg.append(f'<g class="{group_class} js-orbit-group">')
+    yield f'<g class="{group_class} js-orbit-group">'
     for c in orbit_circles:
-        svg.append(f'<circle cx="{c["x"]}" cy="{c["y"]}" r="{c["r"]}" fill="white" />')
-    svg.append('</g>')
+        yield f'<circle cx="{c["x"]}" cy="{c["y"]}" r="{c["r"]}" fill="white" />'
+    yield '</g>'
     
-    svg.append('</mask>')
+    yield '</mask>'
     
-    svg.append('</defs>')
+    yield '</defs>'
     
     # --- 3. GENERATE THE ONE GLOBAL MESH ---
-    global_triangles = generate_global_mesh(WIDTH, HEIGHT, rng)
+    # Colors are generators: the stripe pass consumes all of its draws before
+    # the vibrant pass starts, which keeps the scalar rng order.
+    if engine == "numpy":
+        with instrumentation.stage('mesh'):
+            vertices, triangles, centroids = generate_mesh_arrays(width, height, rng, config)
+        n = len(triangles)
+        corners = vertices[triangles]
+        stripe_colors = iter_batches(lambda a, b: get_stripe_colors(b - a, rng), n)
+        vibrant_colors = iter_batches(lambda a, b: get_vibrant_colors(centroids[a:b], grad_props, rng, config), n)
+    else:
+        with instrumentation.stage('mesh'):
+            global_triangles = generate_global_mesh(width, height, rng, config)
+        n = len(global_triangles)
+        corners = np.array([tri['pts'] for tri in global_triangles], dtype=float)
+        stripe_colors = (get_stripe_color(rng) for _ in global_triangles)
+        vibrant_colors = (get_vibrant_color(tri['cx'], tri['cy'], grad_props, rng, config) for tri in global_triangles)
+
+    # Every color is still drawn below, culled or not, to keep the rng order
+    if cull:
+        with instrumentation.stage('cull'):
+            stripe_keep, circle_keep = cull_mesh(corners, layout, config)
+    else:
+        stripe_keep = circle_keep = np.ones(n, dtype=bool)
+    kept = int(stripe_keep.sum() + circle_keep.sum())
+    instrumentation.count('triangles emitted', kept)
+    instrumentation.count('triangles culled', 2 * n - kept)
+
+    if engine == "numpy":
+        if compact:
+            yield from compact_mesh_passes(short_uid, vertices, triangles, precision, stripe_colors, vibrant_colors,
+                                           clip_stripes_id, mask_circles_id, keep=(stripe_keep, circle_keep))
+            yield '</svg>'
+            return
+        # Each vertex is shared by ~6 triangles, so format it only once
+        vertex_strs = [f"{x:.1f},{y:.1f}" for x, y in vertices.tolist()]
+        tri_list = triangles.tolist()
+        tri_points = lambda i: " ".join([vertex_strs[v] for v in tri_list[i]])
+    else:
+        tri_points = lambda i: " ".join([f"{p[0]:.1f},{p[1]:.1f}" for p in global_triangles[i]['pts']])
     
     # --- 4. RENDER PASS 1: STRIPES (Light Gray) ---
-    # We draw the *entire* mesh, but clipped to the stripe shapes.
+    # The mesh, clipped to the stripe shapes.
     
-    svg.append(f'<g clip-path="url(#{clip_stripes_id})">')
-    for tri in global_triangles:
-        color = get_stripe_color(rng)
-        pts = " ".join([f"{p[0]:.1f},{p[1]:.1f}" for p in tri['pts']])
-        svg.append(f'<polygon points="{pts}" fill="{color}" stroke="{color}" stroke-width="1" stroke-linejoin="round" />')
-    svg.append('</g>')
+    yield f'<g clip-path="url(#{clip_stripes_id})">'
+    for i, color in enumerate(stripe_colors):
+        if stripe_keep[i]:
+            pts = tri_points(i)
+            yield f'<polygon points="{pts}" fill="{color}" stroke="{color}" stroke-width="1" stroke-linejoin="round" />'
+    yield '</g>'
     
     # --- 5. RENDER PASS 2: CIRCLES (Vibrant) ---
-    # Draw the exact same mesh, masked by the circles.
+    # The same mesh, masked by the circles.
     
-    svg.append(f'<g mask="url(#{mask_circles_id})">')
-    for tri in global_triangles:
-        color = get_vibrant_color(tri['cx'], tri['cy'], grad_props, rng)
-        pts = " ".join([f"{p[0]:.1f},{p[1]:.1f}" for p in tri['pts']])
-        svg.append(f'<polygon points="{pts}" fill="{color}" stroke="{color}" stroke-width="1" stroke-linejoin="round" />')
-    svg.append('</g>')
+    yield f'<g mask="url(#{mask_circles_id})">'
+    for i, color in enumerate(vibrant_colors):
+        if circle_keep[i]:
+            pts = tri_points(i)
+            yield f'<polygon points="{pts}" fill="{color}" stroke="{color}" stroke-width="1" stroke-linejoin="round" />'
+    yield '</g>'
     
-    svg.append('</svg>')
+    yield '</svg>'
+
+def write_blog_cover(out, seed=None, unique_id=None, **options):
+    """
+    Streams one cover SVG into `out`: a text or binary file-like object
+    (an open file, sys.stdout, io.StringIO, io.BytesIO, ...).
+    Keyword options are passed to iter_blog_cover.
+    """
+    binary = isinstance(out, (io.RawIOBase, io.BufferedIOBase))
+    sep = b"\n" if binary else "\n"
+    first = True
+    for line in iter_blog_cover(seed=seed, unique_id=unique_id, **options):
+        if binary:
+            line = line.encode('utf-8')
+        if not first:
+            out.write(sep)
+        out.write(line)
+        first = False
+
+def generate_blog_cover(seed=None, filename="cover.svg", unique_id=None, **options):
+    """
+    Writes one cover SVG to `filename` through a buffered stream.
+    Keyword options (engine, compact, precision, config) are passed to iter_blog_cover.
+    """
+    if seed is None: seed = int(time.time())
+    short_uid = cover_uid(seed, unique_id)
     
-    with open(filename, 'w') as f:
-        f.write("\n".join(svg))
+    print(f"Generating clean mesh with Seed: {seed}, UID: {short_uid}")
+    with instrumentation.stage('generate_blog_cover'):
+        with open(filename, 'w', buffering=1 << 16) as f:
+            write_blog_cover(f, seed=seed, unique_id=unique_id, **options)
+    instrumentation.count('covers written')
     print(f"Saved {filename}")
 
+# --- RASTER BACKEND ---
+# Draws the same scene as iter_blog_cover straight into a pixel buffer.
+
+import zlib
+import struct
+
+def scanline_triangle_ids(vertices, triangles, width, height):
+    """
+    Scanline-fills the mesh into an (height, width) array of triangle indices
+    (-1 where no triangle covers the pixel center).
+
+    Every triangle is cut into one horizontal span per pixel row, covering the
+    pixels whose centers fall in [x_start, x_end), and the spans are painted
+    into the buffer in one batched write. Edges are
+    evaluated with their endpoints in a canonical order, so neighbouring
+    triangles agree on shared edges and the mesh tiles without gaps.
+    """
+    corners = vertices[triangles]                        # (T, 3, 2)
+    spans = []
+    for a, b in ((0, 1), (1, 2), (2, 0)):
+        p, q = corners[:, a], corners[:, b]
+        # Canonical endpoint order: top vertex first (ties broken on x)
+        swap = (p[:, 1] > q[:, 1]) | ((p[:, 1] == q[:, 1]) & (p[:, 0] > q[:, 0]))
+        top = np.where(swap[:, None], q, p)
+        bottom = np.where(swap[:, None], p, q)
+        spans.append((top, bottom))
+
+    y_min = np.clip(np.ceil(corners[:, :, 1].min(axis=1) - 0.5), 0, height).astype(np.intp)
+    y_max = np.clip(np.ceil(corners[:, :, 1].max(axis=1) - 0.5), 0, height).astype(np.intp)
+    rows_per_tri = y_max - y_min
+
+    # One entry per (triangle, pixel row) pair
+    tri = np.repeat(np.arange(len(triangles)), rows_per_tri)
+    row = np.arange(rows_per_tri.sum()) - np.repeat(np.cumsum(rows_per_tri) - rows_per_tri, rows_per_tri) + y_min[tri]
+    cy = row + 0.5
+
+    x_lo = np.full(len(tri), np.inf)
+    x_hi = np.full(len(tri), -np.inf)
+    for top, bottom in spans:
+        y0, y1 = top[tri, 1], bottom[tri, 1]
+        active = (y0 <= cy) & (cy < y1)
+        t = np.where(active, (cy - y0) / np.where(y1 > y0, y1 - y0, 1), 0)
+        x = top[tri, 0] + (bottom[tri, 0] - top[tri, 0]) * t
+        x_lo = np.where(active, np.minimum(x_lo, x), x_lo)
+        x_hi = np.where(active, np.maximum(x_hi, x), x_hi)
+
+    # Pixel columns whose centers fall in [x_lo, x_hi)
+    x_start = np.clip(np.ceil(x_lo - 0.5), 0, width).astype(np.intp)
+    x_end = np.clip(np.ceil(x_hi - 0.5), 0, width).astype(np.intp)
+    lengths = np.maximum(x_end - x_start, 0)
+
+    # Expand every span into its flat pixel offsets and paint them all at once
+    first = np.cumsum(lengths) - lengths
+    pixels = np.repeat(row * width + x_start - first, lengths) + np.arange(lengths.sum())
+    ids = np.full(height * width, -1, dtype=np.intp)
+    ids[pixels] = np.repeat(tri, lengths)
+    return ids.reshape(height, width)
+
+def _pixel_centers(width, height):
+    """ Pixel center coordinates as a (1, width) row and a (height, 1) column. """
+    return (np.arange(width) + 0.5)[None, :], (np.arange(height) + 0.5)[:, None]
+
+def stripe_clip_mask(layout, width, height):
+    """ Pixels inside the rotated stripe rectangles (the clipPath). """
+    px, py = _pixel_centers(width, height)
+    cx, cy = width / 2, height / 2
+    angle = math.radians(layout['stripe_rotation'])
+    # Undo the rotate(angle cx cy) transform to test against the axis-aligned rects.
+    # The rects span the whole diagonal, so only the rotated y needs testing.
+    uy = cy - (px - cx) * math.sin(angle) + (py - cy) * math.cos(angle)
+    mask = np.zeros((height, width), dtype=bool)
+    for s in layout['stripes']:
+        mask |= (s['y'] <= uy) & (uy < s['y'] + s['h'])
+    return mask
+
+def circle_mask(layout, width, height):
+    """ Pixels inside the hero and satellite circles (the mask), at rest. """
+    px, py = _pixel_centers(width, height)
+    mask = np.zeros((height, width), dtype=bool)
+    for c in [layout['hero_circle']] + layout['orbit_circles']:
+        mask |= (px - c['x']) ** 2 + (py - c['y']) ** 2 <= c['r'] ** 2
+    return mask
+
+def parse_hex_color(color):
+    color = color.lstrip('#')
+    return [int(color[i:i + 2], 16) for i in (0, 2, 4)]
+
+def rasterize_cover(seed=None, config=None, supersample=2):
+    """
+    Renders the cover for `seed` as an (height, width, 3) uint8 array.
+    Uses the same rng draws as iter_blog_cover, so it is the same picture as the
+    SVG. supersample > 1 renders at that factor and box-filters down, which
+    anti-aliases the stripe and circle edges.
+    """
+    if seed is None: seed = int(time.time())
+    rng = random.Random(seed)
+    config = resolve_config(config)
+    width, height = config['width'], config['height']
+    layout = cover_layout(rng, config)
+
+    vertices, triangles, centroids = generate_mesh_arrays(width, height, rng, config)
+    stripe_rgb = get_stripe_colors(len(triangles), rng, rgb=True)
+    vibrant_rgb = get_vibrant_colors(centroids, layout['grad_props'], rng, config, rgb=True)
+
+    # Render in supersampled pixel space by scaling the scene up
+    k = max(1, int(supersample))
+    big_w, big_h = width * k, height * k
+    big_layout = {
+        'stripe_rotation': layout['stripe_rotation'],
+        'stripes': [{key: v * k for key, v in s.items()} for s in layout['stripes']],
+        'hero_circle': {key: v * k for key, v in layout['hero_circle'].items()},
+        'orbit_circles': [{key: v * k for key, v in c.items()} for c in layout['orbit_circles']],
+    }
+
+    tri_ids = scanline_triangle_ids(vertices * k, triangles, big_w, big_h)
+    covered = tri_ids >= 0
+
+    # One palette lookup per pixel: [background, stripe colors..., vibrant colors...]
+    n = len(triangles)
+    palette = np.vstack([[parse_hex_color(config['bg_color'])], stripe_rgb, vibrant_rgb]).astype(np.uint8)
+    index = np.zeros((big_h, big_w), dtype=np.intp)
+    stripes = covered & stripe_clip_mask(big_layout, big_w, big_h)
+    np.add(tri_ids, 1, out=index, where=stripes)
+    circles = covered & circle_mask(big_layout, big_w, big_h)
+    np.add(tri_ids, 1 + n, out=index, where=circles)
+    image = palette[index]
+
+    if k > 1:
+        total = image.reshape(height, k, width, k, 3).sum(axis=(1, 3), dtype=np.uint32)
+        image = ((total + k * k // 2) // (k * k)).astype(np.uint8)
+    return image
+
+def write_png(out, image, level=6):
+    """ Writes an (height, width, 3) uint8 array as an RGB PNG to a path or binary file-like. """
+    height, width, _ = image.shape
+    # "Sub" filter on every row: flat triangles become runs of zeros, which deflate well
+    rows = image.reshape(height, width * 3).astype(np.int16)
+    filtered = np.empty_like(rows)
+    filtered[:, :3] = rows[:, :3]
+    filtered[:, 3:] = rows[:, 3:] - rows[:, :-3]
+    raw = np.hstack([np.ones((height, 1), dtype=np.uint8), (filtered % 256).astype(np.uint8)])
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    png = b'\x89PNG\r\n\x1a\n'
+    png += chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    png += chunk(b'IDAT', zlib.compress(raw.tobytes(), level))
+    png += chunk(b'IEND', b'')
+
+    if isinstance(out, (str, bytes, os.PathLike)):
+        with open(out, 'wb') as f:
+            f.write(png)
+    else:
+        out.write(png)
+
+def render_cover_png(seed=None, filename="cover.png", config=None, supersample=2):
+    """ Rasterizes one cover (see rasterize_cover) and writes it as a PNG. """
+    if seed is None: seed = int(time.time())
+    print(f"Rasterizing clean mesh with Seed: {seed}")
+    write_png(filename, rasterize_cover(seed=seed, config=config, supersample=supersample))
+    print(f"Saved {filename}")
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a blog cover SVG.")
+    parser.add_argument('--seed', type=int, default=None, help="random seed (default: current time)")
+    parser.add_argument('--uid', default=None, help="id used to scope the SVG (usually the slug)")
+    parser.add_argument('-o', '--output', default="cover.svg", help="output file (.svg or .png), or - for stdout")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default=None, help="output size and density preset")
+    parser.add_argument('--compact', action='store_true', help="write the compact <defs>/<use> form")
+    parser.add_argument('--precision', type=int, default=1, help="coordinate decimals for --compact")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.start(args)
+
+    if args.output.lower().endswith('.png'):
+        with instrumentation.stage('render_cover_png'):
+            render_cover_png(seed=args.seed, filename=args.output, config=args.preset)
+    elif args.output == '-':
+        options = {'compact': args.compact, 'precision': args.precision, 'config': args.preset}
+        write_blog_cover(sys.stdout, seed=args.seed, unique_id=args.uid, **options)
+        sys.stdout.flush()
+    else:
+        options = {'compact': args.compact, 'precision': args.precision, 'config': args.preset}
+        generate_blog_cover(seed=args.seed, filename=args.output, unique_id=args.uid, **options)
+    instrumentation.finish(args)
+
 if __name__ == "__main__":
-    generate_blog_cover(seed=None)
\ No newline at end of file
+    main()
@@ -0,0 +1,211 @@
+import sys
+import json
+import time
+import threading
+import contextlib
+import tracemalloc
+
+# Stage timers and counters shared by the content scripts (gen, regenerate_icons,
+# markdownify, scrape_publications). Off unless a script is run with --profile
+# or --flamegraph: stage() then returns one shared no-op context manager and
+# count() returns at once, so instrumented code pays a global lookup per call.
+#
+# Stages nest per thread and are recorded by path ("main;parse;page"). With
+# memory tracing on, each stage also records the tracemalloc peak reached
+# while it was open. tracemalloc has one peak per process, so a stage that was
+# open at the same time as a stage on another thread gets an upper bound
+# (other threads' allocations count too) and its entry says peak_reliable: False.
+
+_enabled = False
+_memory = False
+_started = None
+_stages = {}      # path -> {'calls', 'seconds', 'peak_bytes', 'peak_reliable'}
+_counters = {}
+_active = set()   # open stages on every thread (memory tracing only)
+_lock = threading.Lock()
+_local = threading.local()
+_NOOP = contextlib.nullcontext()
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def _record(path, seconds, peak, calls=1, reliable=True):
+    with _lock:
+        entry = _stages.get(path)
+        if entry is None:
+            entry = _stages[path] = {'calls': 0, 'seconds': 0.0, 'peak_bytes': None, 'peak_reliable': None}
+        entry['calls'] += calls
+        entry['seconds'] += seconds
+        if peak is not None:
+            entry['peak_bytes'] = max(entry['peak_bytes'] or 0, peak)
+            entry['peak_reliable'] = reliable and entry['peak_reliable'] is not False
+
+class _Stage:
+    __slots__ = ('name', 'path', 'start', 'child_peak', 'overlapped')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = _stack()
+        self.path = f"{stack[-1].path};{self.name}" if stack else self.name
+        self.child_peak = 0
+        self.overlapped = False
+        if _memory:
+            # The enclosing stage keeps the peak it reached so far; ours starts
+            # fresh, unless resetting would cut short the peak of another thread's stage
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, tracemalloc.get_traced_memory()[1])
+            with _lock:
+                others = _active.difference(stack)
+                for other in others:
+                    other.overlapped = True
+                self.overlapped = bool(others)
+                _active.add(self)
+                if not others:
+                    tracemalloc.reset_peak()
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+        peak = None
+        if _memory:
+            peak = max(self.child_peak, tracemalloc.get_traced_memory()[1])
+            with _lock:
+                _active.discard(self)
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+                stack[-1].overlapped = stack[-1].overlapped or self.overlapped
+        _record(self.path, elapsed, peak, reliable=not self.overlapped)
+        return False
+
+def stage(name):
+    """ Context manager timing the enclosed block as a (nested) stage. """
+    return _Stage(name) if _enabled else _NOOP
+
+def count(name, n=1):
+    """ Adds n to a counter. """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def is_enabled():
+    return _enabled
+
+def enable(memory=False):
+    """ Starts collecting (from scratch); memory=True also traces allocations. """
+    global _enabled, _memory, _started
+    reset()
+    _enabled, _memory, _started = True, memory, time.perf_counter()
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disable():
+    global _enabled, _memory
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _enabled = _memory = False
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _active.clear()
+    _local.stack = []
+
+# --- PROCESS POOLS ---
+# Worker processes collect on their own: the parent passes worker_settings()
+# along with each job, the worker calls start_worker() first and returns
+# snapshot() with its result, and the parent merge()s it under its open stage.
+
+def worker_settings():
+    return {'memory': _memory} if _enabled else None
+
+def start_worker(settings):
+    if settings:
+        enable(**settings)
+
+def snapshot():
+    """ Stages and counters collected so far, or None when disabled. """
+    if not _enabled:
+        return None
+    with _lock:
+        return {'stages': {path: dict(entry) for path, entry in _stages.items()}, 'counters': dict(_counters)}
+
+def merge(data):
+    """ Adds a worker's snapshot, nesting its stages under the current stage. """
+    if not _enabled or not data:
+        return
+    stack = _stack()
+    prefix = stack[-1].path + ";" if stack else ""
+    for path, entry in data['stages'].items():
+        _record(prefix + path, entry['seconds'], entry['peak_bytes'], entry['calls'],
+                entry.get('peak_reliable') is not False)
+    for name, n in data['counters'].items():
+        count(name, n)
+
+# --- OUTPUT ---
+
+def report():
+    """ The structured report: wall time, stages by path (in order of first use) and counters. """
+    with _lock:
+        return {'wall_seconds': time.perf_counter() - _started if _started else 0.0,
+                'memory_traced': _memory,
+                'stages': {path: dict(entry) for path, entry in _stages.items()},
+                'counters': dict(_counters)}
+
+def folded_stacks():
+    """
+    Stages as folded stacks ("outer;inner <microseconds>"), the input format of
+    flamegraph.pl, speedscope and inferno. Each line carries the stage's self
+    time, i.e. minus the time of the stages nested in it.
+    """
+    with _lock:
+        totals = {path: entry['seconds'] for path, entry in _stages.items()}
+    own = dict(totals)
+    for path, seconds in totals.items():
+        parent = path.rpartition(';')[0]
+        if parent in own:
+            own[parent] -= seconds
+    return [f"{path} {max(0, round(seconds * 1e6))}" for path, seconds in own.items()]
+
+def write_report(path):
+    with open(path, 'w') as f:
+        json.dump(report(), f, indent=2)
+
+def write_flamegraph(path):
+    with open(path, 'w') as f:
+        f.write("\n".join(folded_stacks()) + "\n")
+
+# --- COMMAND LINE ---
+
+def add_arguments(parser):
+    """ Adds --profile, --flamegraph and --trace-memory to a script's argparse parser. """
+    parser.add_argument('--profile', metavar='JSON', help="write per-stage timings and counters here")
+    parser.add_argument('--flamegraph', metavar='FILE', help="write stage timings as folded stacks here")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="with --profile / --flamegraph, record each stage's tracemalloc peak")
+
+def start(args):
+    """ Enables collection if the parsed args ask for any output. """
+    if args.profile or args.flamegraph:
+        enable(memory=args.trace_memory)
+
+def finish(args):
+    """ Writes the outputs the parsed args ask for; messages go to stderr (stdout may carry an SVG). """
+    if not _enabled:
+        return
+    if args.profile:
+        write_report(args.profile)
+        print(f"Profile written to {args.profile}", file=sys.stderr)
+    if args.flamegraph:
+        write_flamegraph(args.flamegraph)
+        print(f"Folded stacks written to {args.flamegraph}", file=sys.stderr)
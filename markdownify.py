@@ -1,7 +1,23 @@
 import json
 import os
 import re
+import glob
+import time
+import shutil
+import hashlib
+import argparse
+import html
+import multiprocessing
 import requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from requests.adapters import HTTPAdapter
+import instrumentation
+
+# Pillow is only needed for the optional image optimization stage
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
 
 # List of files to process
 
@@ -16,6 +32,38 @@ FILES = [
 
 OUTPUT_DIR = "markdown_blogs"
 
+# Asset downloads: all Reducto image_urls live on the same S3 host, so one
+# pooled session keeps the TLS connections warm across workers.
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_TIMEOUT = 10
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BACKOFF = 0.5   # seconds, doubled after every failed attempt
+DOWNLOAD_CHUNK = 64 * 1024
+
+# Content-addressed asset cache: blobs/<sha256[:2]>/<sha256> plus an index
+# mapping (source JSON path, block position) and URLs to blobs. Block entries
+# also record the figure's object key, so a different figure at the same
+# position is never mistaken for the cached one.
+CACHE_DIR = ".asset_cache"
+
+# Incremental mode: per-block fingerprints of the last conversion, stored next
+# to blog.md, so an unchanged export is a no-op and only changed figures are fetched.
+# Build state rather than content, so it is gitignored wherever it lands.
+FINGERPRINT_FILE = ".blocks.json"
+FINGERPRINT_VERSION = 1
+
+# Optional image optimization (--optimize): downscale to a max display width,
+# recompress (PNG losslessly; JPEG / WebP at `quality`, or losslessly if None)
+# and emit a WebP sibling for each figure.
+OPTIMIZE_DEFAULTS = {'max_width': 1600, 'quality': None}
+OPTIMIZE_WORKERS = 4
+
+# Batch workers start from a fresh interpreter rather than a fork, so
+# process_files is safe to call while other threads (downloads, a build
+# graph) are running
+POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
 def slugify(text):
     """
     Converts text to a slug suitable for directory names.
@@ -25,160 +73,1116 @@ def slugify(text):
     text = re.sub(r'[\s-]+', '-', text)
     return text.strip('-')
 
-def download_image(url, assets_dir, image_count):
+def make_session(pool_size=DOWNLOAD_WORKERS):
+    """
+    Returns a requests Session whose connection pool can serve `pool_size`
+    concurrent downloads to the same host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def image_filename(url, image_count):
+    """
+    Local filename for the image_count-th image, keeping the URL's extension.
+    """
+    img_filename = f"image_{image_count}.png" # Default to png
+    if '?' in url:
+        clean_url = url.split('?')[0]
+        ext = os.path.splitext(clean_url)[1]
+        if ext:
+            img_filename = f"image_{image_count}{ext}"
+    return img_filename
+
+def fetch_to_file(session, url, path, retries=None, backoff=None, headers=None):
+    """
+    Streams url into path, retrying connection errors, 429s and 5xx responses
+    with exponential backoff. The body goes to a .part file that is renamed into
+    place once complete.
+
+    Returns None on failure, else a dict with the body's sha256 and the
+    response's etag / last_modified validators. If `headers` carries
+    conditional request headers and the server answers 304, nothing is written
+    and the dict has not_modified set.
+    """
+    retries = DOWNLOAD_RETRIES if retries is None else retries
+    backoff = DOWNLOAD_BACKOFF if backoff is None else backoff
+    tmp_path = path + ".part"
+    for attempt in range(retries + 1):
+        retryable = True
+        try:
+            with session.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True, headers=headers) as response:
+                validators = {'etag': response.headers.get('ETag'),
+                              'last_modified': response.headers.get('Last-Modified')}
+                if response.status_code == 304 and headers:
+                    instrumentation.count('downloads not modified')
+                    return dict(validators, sha256=None, not_modified=True)
+                if response.status_code == 200:
+                    digest = hashlib.sha256()
+                    size = 0
+                    with open(tmp_path, 'wb') as img_f:
+                        for chunk in response.iter_content(DOWNLOAD_CHUNK):
+                            digest.update(chunk)
+                            img_f.write(chunk)
+                            size += len(chunk)
+                    os.replace(tmp_path, path)
+                    instrumentation.count('downloads')
+                    instrumentation.count('bytes downloaded', size)
+                    return dict(validators, sha256=digest.hexdigest(), not_modified=False)
+                retryable = response.status_code == 429 or response.status_code >= 500
+                error = f"Status: {response.status_code}"
+        except requests.RequestException as e:
+            error = str(e)
+
+        if not retryable or attempt == retries:
+            break
+        instrumentation.count('download retries')
+        time.sleep(backoff * (2 ** attempt))
+
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    print(f"  Failed to download image: {url} ({error})")
+    return None
+
+# --- ASSET CACHE ---
+
+def load_asset_cache(cache_dir=None):
+    """
+    Loads the asset cache index. The cache is a plain dict:
+    {'dir': ..., 'blocks': {block key: {sha256, object, etag}}, 'urls': {url: {sha256, etag, last_modified}},
+     'optimized': {"<sha256>/<settings>": {sha256, webp, width, height}}}
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    cache = {'dir': cache_dir, 'blocks': {}, 'urls': {}, 'optimized': {}}
+    try:
+        with open(os.path.join(cache_dir, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        cache['blocks'] = index.get('blocks', {})
+        cache['urls'] = index.get('urls', {})
+        cache['optimized'] = index.get('optimized', {})
+    except (OSError, ValueError):
+        pass
+    return cache
+
+def save_asset_cache(cache):
+    os.makedirs(cache['dir'], exist_ok=True)
+    index_path = os.path.join(cache['dir'], 'index.json')
+    with open(index_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({'blocks': cache['blocks'], 'urls': cache['urls'], 'optimized': cache['optimized']},
+                  f, indent=2, sort_keys=True)
+    os.replace(index_path + ".tmp", index_path)
+
+def block_key(source, position):
+    """ Index key for the image in block `position` of a Reducto result file. """
+    return f"{os.path.normpath(os.path.abspath(source))}#{position}"
+
+def object_key(url):
+    """
+    The image URL without its query string. Reducto re-signs URLs on every
+    export, but the object key only changes when the figure does.
+    """
+    return url.split('?')[0]
+
+def blob_path(cache, sha256):
+    return os.path.join(cache['dir'], 'blobs', sha256[:2], sha256)
+
+def store_blob(cache, sha256, tmp_path):
+    """ Moves a downloaded file into the blob store (dropping it if the blob exists). """
+    path = blob_path(cache, sha256)
+    if os.path.exists(path):
+        os.remove(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    return path
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def link_blob(cache, sha256, dest):
+    """
+    Hard-links a blob to dest, falling back to a copy across filesystems.
+    A dest that already holds the blob is left alone, keeping its mtime.
+    """
+    if os.path.exists(dest):
+        if os.path.samefile(blob_path(cache, sha256), dest) or file_digest(dest) == sha256:
+            return
+        os.remove(dest)
+    try:
+        os.link(blob_path(cache, sha256), dest)
+    except OSError:
+        shutil.copyfile(blob_path(cache, sha256), dest)
+
+def cached_blob(cache, key, url):
     """
-    Downloads an image from a URL and saves it to the assets directory.
-    Returns the local filename if successful, else None.
+    sha256 of the blob recorded for key, if it was recorded for the same
+    object as url and is still in the store.
     """
+    entry = cache['blocks'].get(key) if key else None
+    if not isinstance(entry, dict) or entry.get('object') != object_key(url):
+        return None
+    if os.path.exists(blob_path(cache, entry['sha256'])):
+        return entry['sha256']
+    return None
+
+def block_blob(cache, key):
+    """ sha256 recorded for key, or None. """
+    entry = cache['blocks'].get(key)
+    return entry['sha256'] if isinstance(entry, dict) else None
+
+def adopt_blob(cache, sha256, path):
+    """
+    Puts an existing local file into the blob store if the store has lost
+    that blob. Returns True if the blob is available afterwards.
+    """
+    if os.path.exists(blob_path(cache, sha256)):
+        return True
+    if not os.path.exists(path) or file_digest(path) != sha256:
+        return False
+    os.makedirs(os.path.dirname(blob_path(cache, sha256)), exist_ok=True)
     try:
-        # Determine filename
-        img_filename = f"image_{image_count}.png" # Default to png
-        if '?' in url:
-            clean_url = url.split('?')[0]
-            ext = os.path.splitext(clean_url)[1]
-            if ext:
-                img_filename = f"image_{image_count}{ext}"
-        
+        os.link(path, blob_path(cache, sha256))
+    except OSError:
+        shutil.copyfile(path, blob_path(cache, sha256))
+    return True
+
+def download_images(urls, assets_dir, session=None, max_workers=DOWNLOAD_WORKERS, cache=None, keys=None,
+                    hints=None):
+    """
+    Downloads urls concurrently over one pooled session.
+
+    Returns the local filenames in input order (None for failures). Numbering
+    follows the sequential behaviour: successful downloads are named
+    image_0, image_1, ... in input order, and failures don't use up a number.
+
+    With a cache (see load_asset_cache) and one block key per url, images
+    whose key is already indexed for the same object are linked from the
+    blob store without any network I/O. The rest are fetched (conditionally, if the url has
+    validators on record), stored by sha256 and indexed.
+
+    hints (one per url, or None) name a blob the url probably serves, as
+    {'sha256', 'etag'}: a url without validators of its own is then fetched
+    with If-None-Match on that etag, and a 304 links the hinted blob.
+    """
+    if not urls:
+        return []
+    keys = keys or [None] * len(urls)
+    hints = hints or [None] * len(urls)
+
+    # Fetch to positional temp names first; numbers depend on which ones succeed
+    tmp_paths = [os.path.join(assets_dir, f".download-{i}") for i in range(len(urls))]
+    results = [None] * len(urls)
+    pending = []
+    for i, key in enumerate(keys):
+        sha256 = cached_blob(cache, key, urls[i]) if cache else None
+        if sha256:
+            results[i] = {'sha256': sha256, 'cached': True}
+        else:
+            pending.append(i)
+
+    def fetch(i):
+        headers = None
+        known = cache['urls'].get(urls[i]) if cache else None
+        if known and os.path.exists(blob_path(cache, known['sha256'])):
+            headers = {}
+            if known.get('etag'): headers['If-None-Match'] = known['etag']
+            if known.get('last_modified'): headers['If-Modified-Since'] = known['last_modified']
+        elif cache and hints[i] and hints[i].get('etag') and os.path.exists(blob_path(cache, hints[i]['sha256'])):
+            known = hints[i]
+            headers = {'If-None-Match': known['etag']}
+        try:
+            result = fetch_to_file(session, urls[i], tmp_paths[i], headers=headers or None)
+        except Exception as e:
+            print(f"  Error downloading image: {e}")
+            return None
+        if result and result['not_modified']:
+            result['sha256'] = known['sha256']
+            result['etag'] = result['etag'] or known.get('etag')
+            result['last_modified'] = result['last_modified'] or known.get('last_modified')
+        return result
+
+    instrumentation.count('downloads cached', len(urls) - len(pending))
+    if pending:
+        session = session or make_session(max_workers)
+        with instrumentation.stage('fetch'), ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for i, result in zip(pending, pool.map(fetch, pending)):
+                results[i] = result
+
+    filenames = []
+    image_count = 0
+    for url, key, tmp_path, result in zip(urls, keys, tmp_paths, results):
+        if not result:
+            filenames.append(None)
+            continue
+        img_filename = image_filename(url, image_count)
         img_path = os.path.join(assets_dir, img_filename)
-        
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            with open(img_path, 'wb') as img_f:
-                img_f.write(response.content)
-            print(f"  Downloaded asset: {img_filename}")
-            return img_filename
+        if cache:
+            if not result.get('cached') and not result['not_modified']:
+                store_blob(cache, result['sha256'], tmp_path)
+            link_blob(cache, result['sha256'], img_path)
+            if not result.get('cached'):
+                if key:
+                    cache['blocks'][key] = {'sha256': result['sha256'], 'object': object_key(url),
+                                            'etag': result.get('etag')}
+                cache['urls'][url] = {'sha256': result['sha256'], 'etag': result.get('etag'),
+                                      'last_modified': result.get('last_modified')}
+            state = "Cached" if result.get('cached') or result['not_modified'] else "Downloaded"
         else:
-            print(f"  Failed to download image: {url} (Status: {response.status_code})")
+            os.replace(tmp_path, img_path)
+            state = "Downloaded"
+        print(f"  {state} asset: {img_filename}")
+        filenames.append(img_filename)
+        image_count += 1
+    return filenames
+
+# --- IMAGE OPTIMIZATION ---
+
+def optimize_settings(max_width=None, quality=None):
+    """ Optimization settings dict, filling in OPTIMIZE_DEFAULTS. """
+    settings = dict(OPTIMIZE_DEFAULTS)
+    if max_width:
+        settings['max_width'] = max_width
+    if quality:
+        settings['quality'] = quality
+    return settings
+
+def settings_key(settings):
+    """ Short, stable name for a settings dict (used in cache keys and fingerprints). """
+    quality = settings['quality'] or 'lossless'
+    return f"w{settings['max_width']}-q{quality}"
+
+def optimize_image(src, dest, webp_dest, settings):
+    """
+    Downscales src to settings['max_width'] and recompresses it into dest, and
+    writes a WebP copy to webp_dest. PNGs are recompressed losslessly; JPEGs
+    are only re-encoded when resized or a quality is set. The WebP copy is
+    lossless for lossless sources unless a quality is set, and always at the
+    downscaled size.
+
+    Outputs that aren't smaller than what they would replace are dropped, so
+    a figure never gets heavier. Returns the final image's width / height and
+    whether dest and webp_dest were kept.
+    """
+    with Image.open(src) as img:
+        img.load()
+        fmt = img.format
+        out = img
+        if img.width > settings['max_width']:
+            height = max(1, round(img.height * settings['max_width'] / img.width))
+            out = img.resize((settings['max_width'], height), Image.LANCZOS)
+
+        written = False
+        if fmt == 'PNG':
+            out.save(dest, 'PNG', optimize=True)
+            written = True
+        elif fmt == 'JPEG' and (out is not img or settings['quality']):
+            out.save(dest, 'JPEG', quality=settings['quality'] or 90, optimize=True, progressive=True)
+            written = True
+        elif out is not img:
+            out.save(dest, fmt)
+            written = True
+        if written and os.path.getsize(dest) >= os.path.getsize(src):
+            os.remove(dest)
+            written = False
+
+        # The WebP copy is always taken from the downscaled image
+        webp = False
+        if fmt != 'WEBP':
+            if settings['quality'] or fmt == 'JPEG':
+                out.save(webp_dest, 'WEBP', quality=settings['quality'] or 90)
+            else:
+                out.save(webp_dest, 'WEBP', lossless=True)
+            webp = os.path.getsize(webp_dest) < os.path.getsize(dest if written else src)
+            if not webp:
+                os.remove(webp_dest)
+        final = out if written else img
+        return {'width': final.width, 'height': final.height, 'image': written, 'webp': webp}
+
+def optimize_assets(cache, assets_dir, assets, settings, max_workers=OPTIMIZE_WORKERS):
+    """
+    Optimizes downloaded figures in place. assets is a list of (local filename,
+    sha256 of the original). Results are content-addressed like downloads, so
+    a figure is only re-encoded the first time it is seen with these settings.
+    Encoding runs in a thread pool (Pillow releases the GIL while resizing
+    and encoding).
+
+    Returns {filename: {'width', 'height', 'webp': sibling filename or None}}
+    for every figure that could be decoded.
+    """
+    if not assets:
+        return {}
+    if Image is None:
+        print("  Pillow is not installed; skipping image optimization")
+        return {}
+    key_suffix = settings_key(settings)
+    pending = [(i, filename, sha256) for i, (filename, sha256) in enumerate(assets)
+               if not cached_optimized(cache, f"{sha256}/{key_suffix}")]
+
+    def run(job):
+        i, filename, sha256 = job
+        tmp_image = os.path.join(assets_dir, f".optimize-{i}")
+        tmp_webp = os.path.join(assets_dir, f".optimize-{i}.webp")
+        try:
+            return optimize_image(blob_path(cache, sha256), tmp_image, tmp_webp, settings)
+        except Exception as e:
+            for tmp_path in (tmp_image, tmp_webp):
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            print(f"  Could not optimize asset: {filename} ({e})")
             return None
-    except Exception as e:
-        print(f"  Error downloading image: {e}")
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for (i, filename, sha256), result in zip(pending, pool.map(run, pending)):
+                if not result:
+                    continue
+                entry = {'sha256': sha256, 'webp': None,
+                         'width': result['width'], 'height': result['height']}
+                if result['image']:
+                    tmp_image = os.path.join(assets_dir, f".optimize-{i}")
+                    entry['sha256'] = file_digest(tmp_image)
+                    store_blob(cache, entry['sha256'], tmp_image)
+                if result['webp']:
+                    tmp_webp = os.path.join(assets_dir, f".optimize-{i}.webp")
+                    entry['webp'] = file_digest(tmp_webp)
+                    store_blob(cache, entry['webp'], tmp_webp)
+                cache['optimized'][f"{sha256}/{key_suffix}"] = entry
+
+    meta = {}
+    for filename, sha256 in assets:
+        entry = cached_optimized(cache, f"{sha256}/{key_suffix}")
+        if not entry:
+            continue
+        link_blob(cache, entry['sha256'], os.path.join(assets_dir, filename))
+        webp_filename = None
+        if entry['webp']:
+            webp_filename = os.path.splitext(filename)[0] + ".webp"
+            link_blob(cache, entry['webp'], os.path.join(assets_dir, webp_filename))
+        meta[filename] = {'width': entry['width'], 'height': entry['height'], 'webp': webp_filename}
+    print(f"  Optimized {len(meta)}/{len(assets)} assets ({len(pending)} encoded)")
+    return meta
+
+def cached_optimized(cache, key):
+    """ The optimization entry for key, if all of its blobs are still in the store. """
+    entry = cache['optimized'].get(key)
+    if not entry or not os.path.exists(blob_path(cache, entry['sha256'])):
+        return None
+    if entry['webp'] and not os.path.exists(blob_path(cache, entry['webp'])):
         return None
+    return entry
 
-def process_file(filename):
+# --- STREAMING READER ---
+# Reducto results carry large payloads we never use (bbox, chart_data,
+# granular_confidence, the OCR dump). The reader below walks the JSON text
+# incrementally and only decodes the block fields we render.
+
+READ_CHUNK = 64 * 1024
+BLOCK_FIELDS = ('type', 'content', 'image_url')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING_BODY = re.compile(r'(?:[^"\\]+|\\.)*', re.S)
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_SCALAR = re.compile(r'[^,\]}\s]*')
+
+class _JsonReader:
     """
-    Processes a single JSON file to extract blog content and assets using 'blocks'.
+    Minimal pull parser over a text stream. Objects and arrays are walked with
+    iter_object / iter_array, whose caller must consume each value with
+    read_value or skip_value before advancing.
+
+    Values are scanned once, chunk by chunk, with the string / escape / depth
+    state carried across reads, so time is linear in the input. Skipped values
+    are never buffered; a value that is read is buffered only while it is
+    being scanned.
     """
-    if not os.path.exists(filename):
-        print(f"Error: File not found - {filename}")
-        return
 
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"Error reading {filename}: {e}")
-        return
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
 
+    def _read(self):
+        """ The next chunk of input ('' at the end). """
+        if self.eof:
+            return ""
+        data = self.f.read(READ_CHUNK)
+        if not data:
+            self.eof = True
+        return data
 
+    def _fill(self):
+        """ Appends the next chunk, dropping what has been consumed. """
+        data = self._read()
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
 
-    result = data.get('result', {})
-    chunks = result.get('chunks', [])
-    blocks = []
-    for chunk in chunks:
-        if 'blocks' in chunk:
-            blocks.extend(chunk['blocks'])
+    def peek(self):
+        """ Next non-whitespace character ('' at end of input). """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
 
-    if not blocks:
-        print(f"Warning: No blocks found in {filename} (checked inside chunks)")
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON input")
+        self.pos += 1
+
+    def _scan(self, keep):
+        """
+        Steps over the next value and returns its text if keep is set. When
+        the buffer runs out, the scan goes on in the next chunk from where it
+        stopped; the part already scanned is kept (as a list of pieces) or
+        dropped.
+        """
+        first = self.peek()
+        if not first:
+            raise ValueError("Unexpected end of JSON input")
+        pieces = []
+        start = i = self.pos
+        depth = 0
+        in_string = escaped = False
+        scalar = first not in '{["'
+        end = None
+        while end is None:
+            buf = self.buf
+            if escaped and i < len(buf):
+                i += 1
+                escaped = False
+            if scalar:
+                i = _SCALAR.match(buf, i).end()
+                if i < len(buf):
+                    end = i
+            while end is None and i < len(buf):
+                if in_string:
+                    i = _STRING_BODY.match(buf, i).end()
+                    if i == len(buf):
+                        continue
+                    if buf[i] == '\\':
+                        # A backslash ending the buffer escapes the next chunk's first character
+                        escaped = True
+                        i = len(buf)
+                    else:
+                        i += 1
+                        in_string = False
+                        if depth == 0:
+                            end = i
+                else:
+                    match = _STRUCTURAL.search(buf, i)
+                    if not match:
+                        i = len(buf)
+                    elif match.group() == '"':
+                        i = match.end()
+                        in_string = True
+                    else:
+                        i = match.end()
+                        depth += 1 if match.group() in '[{' else -1
+                        if depth == 0:
+                            end = i
+            if end is not None:
+                break
+            # Out of input: keep what was scanned (if wanted) and move on to the next chunk
+            if keep:
+                pieces.append(buf[start:])
+            data = self._read()
+            if not data:
+                if scalar:
+                    self.buf, self.pos = "", 0
+                    return "".join(pieces) if keep else None
+                raise ValueError("Unexpected end of JSON input")
+            self.buf, start, i = data, 0, 0
+        self.pos = end
+        if not keep:
+            return None
+        pieces.append(self.buf[start:end])
+        return "".join(pieces)
+
+    def read_string(self):
+        if self.peek() != '"':
+            raise ValueError("Expected '\"' in JSON input")
+        try:
+            # Most strings end inside the buffer
+            value, self.pos = json.decoder.scanstring(self.buf, self.pos + 1)
+            return value
+        except ValueError:
+            return json.loads(self._scan(keep=True))
+
+    def read_value(self):
+        """ Decodes the next value. Memory is bounded by that value. """
+        if self.peek() == '"':
+            return self.read_string()
+        return json.loads(self._scan(keep=True))
+
+    def skip_value(self):
+        """ Steps over the next value without building or buffering it. """
+        self._scan(keep=False)
+
+    def iter_object(self):
+        """ Yields each key; the caller consumes its value before the next one. """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+    def iter_array(self):
+        """ Yields once per element; the caller consumes the element each time. """
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+def _enter(reader, name):
+    """
+    Walks the current object, skipping every value except name's, and yields
+    when the reader is positioned on that value. Non-objects are skipped.
+    """
+    if reader.peek() != '{':
+        reader.skip_value()
         return
+    for key in reader.iter_object():
+        if key == name:
+            yield
+        else:
+            reader.skip_value()
 
+def _elements(reader):
+    """ Yields once per element of the current array; non-arrays are skipped. """
+    if reader.peek() != '[':
+        reader.skip_value()
+        return
+    yield from reader.iter_array()
 
-    # Extract Title first to create directory
-    title = "Untitled Blog"
-    found_title = False
-    
-    # helper to find title in blocks
+def iter_blocks(filename):
+    """
+    Lazily yields the blocks of result.chunks[*].blocks in document order,
+    each reduced to BLOCK_FIELDS. Raises ValueError on malformed JSON.
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        reader = _JsonReader(f)
+        for _ in _enter(reader, 'result'):
+            for _ in _enter(reader, 'chunks'):
+                for _ in _elements(reader):
+                    for _ in _enter(reader, 'blocks'):
+                        for _ in _elements(reader):
+                            if reader.peek() != '{':
+                                reader.skip_value()
+                                continue
+                            block = {}
+                            for key in reader.iter_object():
+                                if key in BLOCK_FIELDS:
+                                    block[key] = reader.read_value()
+                                else:
+                                    reader.skip_value()
+                            yield block
+
+def title_candidate(block):
+    """
+    ('title', text) for a non-empty Title block, ('fallback', text) for a
+    Section Header / Text block whose first line is short enough to stand in
+    for a missing title, else None.
+    """
+    b_type = block.get('type')
+    content = block.get('content', '').strip()
+    if not content:
+        return None
+    if b_type == 'Title':
+        return ('title', content)
+    if b_type in ['Section Header', 'Text']:
+        first_line = content.split('\n')[0]
+        if len(first_line) < 100:
+            return ('fallback', first_line.lstrip('#').strip())
+    return None
+
+def find_title(blocks):
+    """
+    The post title: the first non-empty Title block, else the first short
+    Section Header / Text line. Stops reading at the first Title block.
+    """
+    fallback = None
     for block in blocks:
-        if block.get('type') == 'Title':
-            title = block.get('content', '').strip()
-            if title:
-                found_title = True
-                break
-    
-    # Fallback if no Title block
-    if not found_title:
-        # Look for first header or text
-        for block in blocks:
-            b_type = block.get('type')
-            content = block.get('content', '').strip()
-            if not content: continue
-            
-            if b_type in ['Section Header', 'Text']:
-                first_line = content.split('\n')[0]
-                if len(first_line) < 100:
-                    title = first_line.lstrip('#').strip()
-                    break
-    
-    # Create Directories
+        candidate = title_candidate(block)
+        if not candidate:
+            continue
+        kind, text = candidate
+        if kind == 'title':
+            return text
+        if fallback is None:
+            fallback = text
+    return fallback if fallback is not None else "Untitled Blog"
+
+def title_slug(title, filename):
+    """ Directory name for a post, falling back to the source file name. """
     slug = slugify(title)
     if not slug or slug == "untitled-blog":
          slug = f"blog-{os.path.basename(filename).replace('.json', '')}"
+    return slug
 
-    blog_dir = os.path.join(OUTPUT_DIR, slug)
-    assets_dir = os.path.join(blog_dir, 'assets')
-    os.makedirs(assets_dir, exist_ok=True)
+def blog_slug(filename):
+    """ The slug process_file would pick for filename, or None if it can't be read. """
+    if not os.path.exists(filename):
+        print(f"Error: File not found - {filename}")
+        return None
+    seen = []
+    def counted(blocks):
+        for block in blocks:
+            seen.append(True)
+            yield block
+    try:
+        title = find_title(counted(iter_blocks(filename)))
+    except (OSError, ValueError) as e:
+        print(f"Error reading {filename}: {e}")
+        return None
+    if not seen:
+        print(f"Warning: No blocks found in {filename} (checked inside chunks)")
+        return None
+    return title_slug(title, filename)
+
+def render_block(block, position, filename, markdown_lines, image_urls, image_keys):
+    """
+    Appends one block's markdown to markdown_lines. Images become
+    (index, alt content) placeholders and their urls / cache keys are queued
+    for the download stage.
+    """
+    b_type = block.get('type')
+    content = block.get('content', '')
+    image_url = block.get('image_url')
+
+    if not content and not image_url:
+        return
+
+    if image_url:
+        # Handle Image/Figure
+        markdown_lines.append((len(image_urls), content))
+        image_urls.append(image_url)
+        image_keys.append(block_key(filename, position))
+
+    elif b_type == 'Title':
+        markdown_lines.append(f"# {content}\n")
+
+    elif b_type == 'Section Header':
+         markdown_lines.append(f"## {content}\n")
+
+    elif b_type == 'List Item':
+        markdown_lines.append(f"{content}\n")
+
+    elif b_type == 'Footer' or b_type == 'Page Number':
+        pass # Skip footers/page numbers
+
+    else:
+        # Standard Text and other types
+        markdown_lines.append(f"{content}\n")
+
+# --- INCREMENTAL MODE ---
+
+def block_fingerprint(block):
+    """
+    [type, content hash, image hash] for a block. The image hash covers the
+    image's object key (see object_key). Reducto gives every export job its
+    own object keys, so a re-export changes the image hash of every figure;
+    reuse_figures then confirms unchanged images with a conditional request
+    instead of refetching them.
+    """
+    content = block.get('content', '')
+    image_url = block.get('image_url')
+    return [block.get('type'),
+            hashlib.sha256(content.encode('utf-8')).hexdigest() if content else None,
+            hashlib.sha256(object_key(image_url).encode('utf-8')).hexdigest() if image_url else None]
+
+def load_fingerprints(blog_dir):
+    """ The fingerprint record of blog_dir's last conversion, or None. """
+    try:
+        with open(os.path.join(blog_dir, FINGERPRINT_FILE), 'r', encoding='utf-8') as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if record.get('version') != FINGERPRINT_VERSION:
+        return None
+    return record
+
+def save_fingerprints(blog_dir, record):
+    """ Writes the fingerprint record, unless it is already on disk unchanged. """
+    record = dict(record, version=FINGERPRINT_VERSION)
+    if load_fingerprints(blog_dir) == record:
+        return
+    path = os.path.join(blog_dir, FINGERPRINT_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+def is_unchanged(previous, fingerprints, blog_dir, optimize=None):
+    """
+    True if the export has the same blocks as the last conversion, every
+    figure was fetched, the optimization settings match, and blog.md / the
+    assets are still as written.
+    """
+    if not previous or [b['fingerprint'] for b in previous['blocks']] != fingerprints:
+        return False
+    if previous.get('optimize') != (settings_key(optimize) if optimize else None):
+        return False
+    md_path = os.path.join(blog_dir, 'blog.md')
+    if not os.path.exists(md_path) or file_digest(md_path) != previous['markdown']:
+        return False
+    for b in previous['blocks']:
+        if b['fingerprint'][2] and not (b.get('file') and
+                os.path.exists(os.path.join(blog_dir, 'assets', b['file']))):
+            return False
+    return True
+
+def reuse_figures(previous, fingerprints, image_positions, image_urls, cache, filename, assets_dir):
+    """
+    Seeds the cache index so figures whose fingerprint is unchanged are linked
+    from the blob store (or adopted from the old assets directory) instead of
+    being fetched again. Changed figures lose their positional index entry,
+    which describes whatever sat at that position in the previous export.
+
+    A changed figure whose type and caption match an old figure (preferably
+    the one at the same position) most likely only moved to a new object key,
+    so that figure's blob and etag become its download hint (see
+    download_images). Returns (number reused, hints).
+    """
+    known = {}
+    similar = {}
+    old_blocks = previous['blocks'] if previous else []
+    for b in old_blocks:
+        if b.get('sha256') and b.get('file'):
+            known.setdefault(tuple(b['fingerprint']), b)
+            if b.get('etag'):
+                similar.setdefault(tuple(b['fingerprint'][:2]), b)
+    reused = 0
+    hints = []
+    for position, url in zip(image_positions, image_urls):
+        fingerprint = fingerprints[position]
+        old = known.get(tuple(fingerprint))
+        key = block_key(filename, position)
+        if old and adopt_blob(cache, old['sha256'], os.path.join(assets_dir, old['file'])):
+            cache['blocks'][key] = {'sha256': old['sha256'], 'object': object_key(url), 'etag': old.get('etag')}
+            reused += 1
+            hints.append(None)
+            continue
+        cache['blocks'].pop(key, None)
+        hint = old_blocks[position] if position < len(old_blocks) else {}
+        if hint.get('fingerprint', [])[:2] != fingerprint[:2] or not hint.get('etag') or not hint.get('sha256'):
+            hint = similar.get(tuple(fingerprint[:2]))
+        if hint and adopt_blob(cache, hint['sha256'], os.path.join(assets_dir, hint['file'])):
+            hints.append({'sha256': hint['sha256'], 'etag': hint['etag']})
+        else:
+            hints.append(None)
+    return reused, hints
+
+def process_file(filename, cache=None, slug=None, output_dir=None, incremental=False, optimize=None):
+    """
+    Processes a single JSON file to extract blog content and assets using 'blocks'.
+    Assets go through the content-addressed cache (loaded from CACHE_DIR unless
+    one is passed in), so unchanged figures are never fetched twice.
+
+    slug overrides the title-derived directory name (see resolve_slugs) and
+    output_dir overrides OUTPUT_DIR. Returns the slug written, or None.
+
+    Blocks are streamed from the file (see iter_blocks) and the title is found
+    in the same single pass that renders them, so only one block is decoded
+    at a time.
+
+    Every conversion records per-block fingerprints next to blog.md. With
+    incremental set, they are diffed against the new export: if nothing
+    changed the post is left untouched, otherwise only changed figures are
+    fetched and blog.md is rewritten only if its content differs.
+
+    optimize (see optimize_settings) runs the downloaded figures through
+    optimize_assets; figures are then emitted as <img> tags carrying their
+    width and height so the page can reserve space for them, wrapped in a
+    <picture> with a WebP <source> when a smaller WebP sibling was kept.
+    """
+    if not os.path.exists(filename):
+        print(f"Error: File not found - {filename}")
+        return None
 
     # Reconstruct Content from Blocks
+    # Images are collected as placeholders and downloaded together afterwards,
+    # once the title (and so the assets directory) is known
     markdown_lines = []
-    image_count = 0
+    image_urls = []
+    image_keys = []
+    fingerprints = []
+    title = fallback_title = None
+    num_blocks = 0
     
-    for block in blocks:
-        b_type = block.get('type')
-        content = block.get('content', '')
-        image_url = block.get('image_url')
+    try:
+        with instrumentation.stage('render_blocks'):
+            for position, block in enumerate(iter_blocks(filename)):
+                num_blocks += 1
+                fingerprints.append(block_fingerprint(block))
+                if title is None:
+                    candidate = title_candidate(block)
+                    if candidate and candidate[0] == 'title':
+                        title = candidate[1]
+                    elif candidate and fallback_title is None:
+                        fallback_title = candidate[1]
+                render_block(block, position, filename, markdown_lines, image_urls, image_keys)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {filename}: {e}")
+        return None
+    instrumentation.count('blocks processed', num_blocks)
 
-        if not content and not image_url:
-            continue
+    if not num_blocks:
+        print(f"Warning: No blocks found in {filename} (checked inside chunks)")
+        return None
 
-        if image_url:
-            # Handle Image/Figure
-            local_filename = download_image(image_url, assets_dir, image_count)
-            if local_filename:
-                # Use content as alt text, truncated
-                alt_text = content.replace('\n', ' ')[:100] if content else f"Image {image_count}"
-                markdown_lines.append(f"\n![{alt_text}](assets/{local_filename})\n")
-                
-                # Optionally add caption if it's a Figure with long content? 
-                # For now just the image is usually safer to avoid duplicating OCR'd text of charts.
-                image_count += 1
+    # Extract Title first to create directory
+    if slug is None:
+        if title is None:
+            title = fallback_title if fallback_title is not None else "Untitled Blog"
+        slug = title_slug(title, filename)
+
+    # Create Directories
+    blog_dir = os.path.join(output_dir or OUTPUT_DIR, slug)
+    assets_dir = os.path.join(blog_dir, 'assets')
+    previous = load_fingerprints(blog_dir) if incremental else None
+    if is_unchanged(previous, fingerprints, blog_dir, optimize):
+        print(f"Unchanged blog: {slug} (from {filename})")
+        return slug
+    os.makedirs(assets_dir, exist_ok=True)
+
+    # Download stage: fetch every figure concurrently, then fill in the placeholders
+    own_cache = cache is None
+    if own_cache:
+        cache = load_asset_cache()
+    image_positions = [position for position, fp in enumerate(fingerprints) if fp[2]]
+    hints = None
+    if previous:
+        reused, hints = reuse_figures(previous, fingerprints, image_positions, image_urls, cache, filename, assets_dir)
+        print(f"  Reusing {reused}/{len(image_urls)} unchanged figures")
+    with instrumentation.stage('download_images'):
+        local_filenames = download_images(image_urls, assets_dir, cache=cache, keys=image_keys, hints=hints)
+    instrumentation.count('figures', len(image_urls))
+    optimized = {}
+    if optimize:
+        assets = [(f, block_blob(cache, key)) for f, key in zip(local_filenames, image_keys) if f]
+        with instrumentation.stage('optimize_assets'):
+            optimized = optimize_assets(cache, assets_dir, assets, optimize)
+    if own_cache:
+        save_asset_cache(cache)
+    resolved_lines = []
+    image_count = 0
+    for line in markdown_lines:
+        if isinstance(line, str):
+            resolved_lines.append(line)
+            continue
+        index, content = line
+        local_filename = local_filenames[index]
+        if local_filename:
+            # Use content as alt text, truncated
+            alt_text = content.replace('\n', ' ')[:100] if content else f"Image {image_count}"
+            meta = optimized.get(local_filename)
+            if meta:
+                img = (f"<img src=\"assets/{local_filename}\" alt=\"{html.escape(alt_text)}\" "
+                       f"width=\"{meta['width']}\" height=\"{meta['height']}\" />")
+                if meta['webp']:
+                    # Browsers that take WebP load the sibling, the rest the original
+                    img = f"<picture><source type=\"image/webp\" srcset=\"assets/{meta['webp']}\" />{img}</picture>"
+                resolved_lines.append(f"\n{img}\n")
             else:
-                # Fallback if download fails: keep content if meaningful?
-                pass
-        
-        elif b_type == 'Title':
-            markdown_lines.append(f"# {content}\n")
-        
-        elif b_type == 'Section Header':
-             markdown_lines.append(f"## {content}\n")
-             
-        elif b_type == 'List Item':
-            markdown_lines.append(f"{content}\n")
-            
-        elif b_type == 'Footer' or b_type == 'Page Number':
-            pass # Skip footers/page numbers
+                resolved_lines.append(f"\n![{alt_text}](assets/{local_filename})\n")
             
+            # Optionally add caption if it's a Figure with long content? 
+            # For now just the image is usually safer to avoid duplicating OCR'd text of charts.
+            image_count += 1
         else:
-            # Standard Text and other types
-            markdown_lines.append(f"{content}\n")
+            # Fallback if download fails: keep content if meaningful?
+            pass
 
-    full_content = "\n".join(markdown_lines)
+    full_content = "\n".join(resolved_lines)
 
-    # Write blog.md
-    with open(os.path.join(blog_dir, 'blog.md'), 'w', encoding='utf-8') as f:
-        f.write(full_content)
+    # Write blog.md (in incremental mode, only if it changed, so its mtime stays put)
+    md_path = os.path.join(blog_dir, 'blog.md')
+    md_digest = hashlib.sha256(full_content.encode('utf-8')).hexdigest()
+    if incremental and os.path.exists(md_path) and file_digest(md_path) == md_digest:
+        print("  blog.md unchanged")
+    else:
+        with open(md_path, 'w', encoding='utf-8') as f:
+            f.write(full_content)
+
+    # Record what each block became; drop figures the new export no longer has
+    blocks = [{'fingerprint': fp} for fp in fingerprints]
+    for position, key, local_filename in zip(image_positions, image_keys, local_filenames):
+        if local_filename:
+            blocks[position]['file'] = local_filename
+            blocks[position]['sha256'] = block_blob(cache, key)
+            blocks[position]['etag'] = (cache['blocks'].get(key) or {}).get('etag')
+            if optimized.get(local_filename, {}).get('webp'):
+                blocks[position]['webp'] = optimized[local_filename]['webp']
+    if previous:
+        current = set(local_filenames) | set(m['webp'] for m in optimized.values())
+        for b in previous['blocks']:
+            for stale in (b.get('file'), b.get('webp')):
+                if stale and stale not in current and os.path.exists(os.path.join(assets_dir, stale)):
+                    os.remove(os.path.join(assets_dir, stale))
+    save_fingerprints(blog_dir, {'source': os.path.basename(filename), 'markdown': md_digest,
+                                 'optimize': settings_key(optimize) if optimize else None,
+                                 'blocks': blocks})
 
     print(f"Successfully created blog: {slug} (from {filename})")
+    return slug
+
+# --- BATCH CLI ---
+
+def collect_inputs(paths):
+    """
+    Expands files, globs and directories (every *.json inside) into a sorted,
+    de-duplicated list of Reducto result files.
+    """
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(os.path.join(path, '*.json'))
+        else:
+            matches = glob.glob(path) or [path]
+        found.update(os.path.normpath(m) for m in matches)
+    return sorted(found)
+
+def resolve_slugs(filenames, slugs):
+    """
+    Makes slugs unique. Files are taken in (sorted) input order: the first file
+    for a slug keeps it, later ones get -2, -3, ... so reruns always agree.
+    """
+    taken = set(s for s in slugs if s)
+    seen = set()
+    resolved = []
+    for filename, slug in zip(filenames, slugs):
+        if slug is None or slug not in seen:
+            seen.add(slug)
+            resolved.append(slug)
+            continue
+        n = 2
+        while f"{slug}-{n}" in taken:
+            n += 1
+        print(f"Slug collision: {filename} -> {slug}-{n}")
+        taken.add(f"{slug}-{n}")
+        resolved.append(f"{slug}-{n}")
+    return resolved
+
+INDEX_SECTIONS = ('blocks', 'urls', 'optimized')
+
+def index_changes(before, after):
+    """
+    What a worker did to its copy of the cache index:
+    {section: (entries added or changed, keys removed)}.
+    """
+    changes = {}
+    for section in INDEX_SECTIONS:
+        old, new = before[section], after[section]
+        changes[section] = ({k: v for k, v in new.items() if old.get(k) != v},
+                            [k for k in old if k not in new])
+    return changes
 
-def main():
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
-        
-    print(f"Processing {len(FILES)} files...")
+def _process_job(job):
+    """
+    Process pool worker. Runs process_file against a private copy of the asset
+    cache and hands only the index entries it added, changed or removed back
+    for the parent to merge.
+    """
+    filename, slug, output_dir, cache_dir, incremental, optimize, profile = job
+    instrumentation.start_worker(profile)
+    cache = load_asset_cache(cache_dir)
+    loaded = {section: dict(cache[section]) for section in INDEX_SECTIONS}
+    start = time.perf_counter()
+    try:
+        with instrumentation.stage('process_file'):
+            written = process_file(filename, cache=cache, slug=slug, output_dir=output_dir,
+                                   incremental=incremental, optimize=optimize)
+        status = "ok" if written else "failed"
+    except Exception as e:
+        status = f"error: {e}"
+    elapsed = time.perf_counter() - start
+    return {'file': filename, 'slug': slug, 'status': status, 'seconds': elapsed,
+            'index': index_changes(loaded, cache), 'profile': instrumentation.snapshot()}
+
+def process_files(filenames, jobs=None, output_dir=None, incremental=False, optimize=None):
+    """
+    Converts many Reducto results across a process pool. Slugs are resolved
+    up front so colliding titles are handled deterministically. Returns one
+    report dict per file, in input order.
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=POOL_CONTEXT) as pool:
+        slugs = resolve_slugs(filenames, list(pool.map(blog_slug, filenames)))
+        profile = instrumentation.worker_settings()
+        job_args = [(f, s, output_dir, CACHE_DIR, incremental, optimize, profile)
+                    for f, s in zip(filenames, slugs) if s]
+        reports = list(pool.map(_process_job, job_args))
+
+    # Merge what each worker changed. Block keys belong to one source file, and
+    # url / optimized entries are content-addressed, so order doesn't matter
+    cache = load_asset_cache()
+    for report in reports:
+        for section, (updated, removed) in report.pop('index').items():
+            cache[section].update(updated)
+            for key in removed:
+                cache[section].pop(key, None)
+        instrumentation.merge(report.pop('profile'))
+    save_asset_cache(cache)
+
+    by_file = {r['file']: r for r in reports}
+    return [by_file.get(f, {'file': f, 'slug': None, 'status': "unreadable", 'seconds': 0.0})
+            for f in filenames]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert Reducto parse results to markdown blogs.")
+    parser.add_argument('inputs', nargs='*', default=FILES,
+                        help="result files, globs or directories of *.json (default: the FILES list)")
+    parser.add_argument('-o', '--output-dir', default=OUTPUT_DIR, help="where <slug>/blog.md is written")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="diff against the last conversion's block fingerprints; skip unchanged posts")
+    parser.add_argument('--optimize', action='store_true',
+                        help="downscale / recompress figures and emit WebP siblings (needs Pillow)")
+    parser.add_argument('--max-width', type=int, default=None,
+                        help=f"optimized figure width (default: {OPTIMIZE_DEFAULTS['max_width']})")
+    parser.add_argument('--quality', type=int, default=None,
+                        help="JPEG / WebP quality (default: lossless)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.start(args)
+
+    filenames = collect_inputs(args.inputs)
+    print(f"Processing {len(filenames)} files...")
     
-    for filename in FILES:
-        process_file(filename)
-        
-    print("Done.")
+    start = time.perf_counter()
+    with instrumentation.stage('process_files'):
+        reports = process_files(filenames, jobs=args.jobs, output_dir=args.output_dir,
+                                incremental=args.incremental,
+                                optimize=optimize_settings(args.max_width, args.quality) if args.optimize else None)
+
+    for r in reports:
+        print(f"  {r['status']:<10} {r['seconds']:6.2f}s  {r['file']} -> {r['slug'] or '-'}")
+    ok = sum(1 for r in reports if r['status'] == "ok")
+    print(f"Done. {ok}/{len(reports)} converted in {time.perf_counter() - start:.2f}s.")
+    instrumentation.finish(args)
 
 if __name__ == "__main__":
     main()
@@ -1,16 +1,123 @@
-
 import os
 import sys
+import json
+import time
 import hashlib
-from gen import generate_blog_cover
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import instrumentation
+from gen import generate_blog_cover, GENERATOR_VERSION
 
 BLOG_DIR = "content/blogs"
+# Build state, kept at the repo root (and gitignored) rather than in the content tree
+MANIFEST_FILE = ".covers-manifest.json"
+
+# Options passed through to generate_blog_cover. Part of the manifest key,
+# so changing them invalidates every cached cover.
+COVER_CONFIG = {"engine": "numpy", "compact": False, "precision": 1}
+
+# Render workers never fork the (possibly threaded) caller
+POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+def cover_seed(slug):
+    """ Stable seed derived from the slug. """
+    hex_hash = hashlib.md5(slug.encode('utf-8')).hexdigest()
+    return int(hex_hash, 16) % 10000000
+
+def cover_key(slug, seed, config):
+    """ Manifest key for one cover: (slug, seed, generator version, config). """
+    payload = json.dumps([slug, seed, GENERATOR_VERSION, config], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def is_up_to_date(entry, key, target_file):
+    """ The cover is current if the key matches and the file is the one we wrote. """
+    if not entry or entry.get('key') != key or not os.path.exists(target_file):
+        return False
+    return file_digest(target_file) == entry.get('sha256')
+
+def render_cover(job):
+    """ Process pool worker: renders one cover and returns its manifest entry (and profile snapshot). """
+    slug, seed, target_file, config, profile = job
+    instrumentation.start_worker(profile)
+    generate_blog_cover(seed=seed, filename=target_file, unique_id=slug, **config)
+    return slug, file_digest(target_file), instrumentation.snapshot()
+
+def regenerate_batch(jobs=None, force=False, config=COVER_CONFIG):
+    """
+    Regenerates covers across a process pool, skipping every slug whose
+    manifest entry matches its (slug, seed, generator version, config) key.
+    Returns (generated, skipped) counts.
+    """
+    manifest = load_manifest()
+    pending = []
+    skipped = 0
+    for entry in sorted(os.scandir(BLOG_DIR), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        slug = entry.name
+        seed = cover_seed(slug)
+        target_file = os.path.join(entry.path, "blog.svg")
+        key = cover_key(slug, seed, config)
+        if not force and is_up_to_date(manifest.get(slug), key, target_file):
+            skipped += 1
+            continue
+        pending.append(((slug, seed, target_file, config, instrumentation.worker_settings()), key))
+    instrumentation.count('covers skipped', skipped)
+
+    if pending:
+        with instrumentation.stage('render'), ProcessPoolExecutor(max_workers=jobs, mp_context=POOL_CONTEXT) as pool:
+            results = pool.map(render_cover, [job for job, _ in pending])
+            for (slug, digest, profile), (_, key) in zip(results, pending):
+                manifest[slug] = {'key': key, 'sha256': digest}
+                instrumentation.merge(profile)
+        save_manifest(manifest)
+
+    return len(pending), skipped
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate blog cover icons.")
+    parser.add_argument('--batch', action='store_true',
+                        help="regenerate in a process pool, skipping covers that are already up to date")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="worker processes for --batch (default: CPU count)")
+    parser.add_argument('--force', action='store_true',
+                        help="with --batch, ignore the manifest and regenerate everything")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.start(args)
 
-def main():
     if not os.path.exists(BLOG_DIR):
         print(f"Error: {BLOG_DIR} not found.")
         return
 
+    if args.batch:
+        start = time.perf_counter()
+        with instrumentation.stage('regenerate_batch'):
+            generated, skipped = regenerate_batch(jobs=args.jobs, force=args.force)
+        elapsed = time.perf_counter() - start
+        print(f"Generated {generated} blog icons, skipped {skipped} up to date ({elapsed:.2f}s).")
+        instrumentation.finish(args)
+        return
+
     count = 0
     for entry in os.scandir(BLOG_DIR):
         if entry.is_dir():
@@ -19,12 +126,12 @@ def main():
             print(f"Regenerating for {slug}...")
             # Generate new cover for this blog
             # Use stable hash of slug for seed
-            hex_hash = hashlib.md5(slug.encode('utf-8')).hexdigest()
-            seed = int(hex_hash, 16) % 10000000
+            seed = cover_seed(slug)
             generate_blog_cover(seed=seed, filename=target_file, unique_id=slug)
             count += 1
             
     print(f"Successfully regenerated {count} blog icons.")
+    instrumentation.finish(args)
 
 if __name__ == "__main__":
     main()
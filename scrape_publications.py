@@ -1,47 +1,499 @@
 import requests
 from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+import html.entities
 import json
 import re
 import os
+import sys
+import glob
+import time
+import random
+import difflib
+import hashlib
+import argparse
+import unicodedata
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import instrumentation
 
-def parse_old_cbcl():
-    filename = "old_cbcl.html"
+# Parser backends: 'bs4' builds a BeautifulSoup tree per page and is the
+# reference implementation; 'stream' pulls the same fields out of the page in
+# one forward pass over html.parser events, without building a tree.
+DEFAULT_BACKEND = "stream"
+
+PUBLICATIONS_FILE = os.path.join('app', 'data', 'publications.json')
+# The old CBCL archive page; every other saved page is a CBMM biblio listing
+CBCL_PAGE = "old_cbcl.html"
+CBMM_PAGES = "cbmm_page_*.html"
+
+# Parsed entries per page, keyed by page content and parser. Bump
+# PARSER_VERSION whenever extraction or entry post-processing changes, so
+# cached pages get reparsed.
+PARSE_CACHE_FILE = ".publications-cache.json"
+PARSER_VERSION = "1"
+
+# build_content calls main() from one of its graph threads, and forking a
+# threaded process can copy a lock that another thread holds. Parse workers
+# therefore start from a fresh interpreter (forkserver, or spawn where
+# forkserver is unavailable).
+POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# Year shards, search index and manifest for the site to load lazily
+SHARDS_DIR = os.path.join('public', 'data', 'publications')
+SHARD_FIELDS = ['title', 'authors', 'venue', 'year', 'link']
+INDEX_FIELDS = ['title', 'authors', 'venue']
+
+def read_page(filename):
+    """ Page source, or None (with a message) if it can't be read. """
     try:
         with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read()
+            return f.read()
     except Exception as e:
         print(f"Error reading {filename}: {e}")
-        return []
+        return None
 
+# --- BEAUTIFULSOUP BACKEND ---
+
+def extract_cbcl_soup(content):
+    """
+    Candidate elements of the old CBCL page, in document order: one dict per
+    p/h3/h4/div with its text and its first link as (href, text), or None if
+    the page has no content area.
+    """
     soup = BeautifulSoup(content, 'html.parser')
-    publications = []
-    
-    current_year = ""
-    
     content_div = soup.find('div', class_='entry-content') or soup.find('div', class_='field-item') or soup.body
-    
+
     if not content_div:
-        return []
+        return None
+
+    elements = []
+    for element in content_div.find_all(['p', 'h3', 'h4', 'div']):
+        links = element.find_all('a')
+        link = (links[0].get('href'), links[0].get_text()) if links else None
+        elements.append({'text': element.get_text(), 'link': link})
+    return elements
+
+def extract_biblio_soup(content, section_year=""):
+    """
+    Raw fields of every biblio-entry on a CBMM page (see biblio_publication).
+    Entries outside any biblio-category-section get section_year (for parsing
+    a fragment of a page, see extract_biblio_stream).
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    records = []
+
+    # Logic: find 'biblio-entry' divs
+
+    entries = soup.find_all('div', class_='biblio-entry')
+
+    for entry in entries:
+        # Title
+        title_elem = entry.find(class_='biblio-title')
+
+        # Link - check for PDF first, otherwise title link
+        pdf_span = entry.find(class_='biblio_file_links')
+        pdf_href = None
+        if pdf_span:
+            pdf_link = pdf_span.find('a', href=True)
+            if pdf_link:
+                pdf_href = pdf_link['href']
+        title_link = entry.find('a', href=True)
+
+        # Check for "at < url >" or "arXiv:..." if no PDF link found or as alternative
+        # Using regex on the full text of the entry (before decomposition)
+        full_text_for_link = entry.get_text(" ", strip=True)
+
+        # Authors
+        authors_elem = entry.find(class_='biblio-authors')
+
+        record = {
+            'title': title_elem.get_text() if title_elem else None,
+            'authors': authors_elem.get_text() if authors_elem else None,
+            'pdf_href': pdf_href,
+            'first_href': title_link['href'] if title_link else None,
+            'link_text': full_text_for_link,
+        }
+
+        # Decompose file links, Z3988 (citation), and extracted title/authors
+        # This ensures they don't appear in the venue text
+        for elem in entry.find_all(class_=['biblio_file_links', 'Z3988']):
+            elem.decompose()
+
+        # We can also decompose title and authors to ensure they are definitely gone from text
+        if title_elem:
+            # Note: title might be inside an 'a' tag which might be separate or inside
+            # Usually title_elem is the span.biblio-title.
+            title_elem.decompose()
+
+        if authors_elem:
+            authors_elem.decompose()
+
+        # Venue & Year from text
+        # The text inside biblio-entry but outside spans usually contains venue and year
+        record['text'] = entry.get_text(" ", strip=True)
+
+        # Check context: parent 'biblio-category-section' -> 'biblio-separator-bar'
+        record['section_year'] = section_year
+        section = entry.find_parent(class_='biblio-category-section')
+        if section:
+            sep = section.find(class_='biblio-separator-bar')
+            if sep:
+                record['section_year'] = sep.get_text().strip()
+        records.append(record)
+    return records
+
+# --- STREAMING BACKEND ---
+
+# Elements BeautifulSoup's html.parser builder closes as soon as they open
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+                 'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+                 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'}
+# Elements whose strings get_text() leaves out
+HIDDEN_TEXT_ELEMENTS = {'script', 'style', 'template', 'rt', 'rp'}
+PRESERVE_WHITESPACE_ELEMENTS = {'pre', 'textarea'}
+ASCII_SPACES = ' \n\t\x0c\r'
+# Named references as BeautifulSoup resolves them (unknown names stay literal, minus the ';')
+ENTITIES = {name.rstrip(';'): char for name, char in html.entities.html5.items()}
+
+def remove_identical(items, item):
+    """ Removes the last occurrence of item itself (not just an equal value). """
+    for i in range(len(items) - 1, -1, -1):
+        if items[i] is item:
+            del items[i]
+            return
+
+class _TextTracker(HTMLParser):
+    """
+    Forward-only html.parser handler that nests elements and splits text into
+    strings the way BeautifulSoup's html.parser builder does (no implied end
+    tags, stray end tags ignored, whitespace-only strings collapsed), without
+    building a tree. Subclasses override start / end / string, and can
+    capture(parts) to collect the strings get_text() would join for an element.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []
+        self.open_names = {}
+        self.data = []
+        self.closed_void = []
+        self.captures = []
+        self.hidden = 0
+        self.preserve = 0
+
+    # Hooks: an element (a dict with name / attrs / classes) opens or closes,
+    # or a string that get_text() would include is complete
+    def start(self, element): pass
+    def end(self, element): pass
+    def string(self, text): pass
+
+    def capture(self, parts):
+        self.captures.append(parts)
+
+    def release(self, parts):
+        remove_identical(self.captures, parts)
+
+    def flush(self):
+        if not self.data:
+            return
+        text = "".join(self.data)
+        self.data = []
+        if not self.preserve and not text.strip(ASCII_SPACES):
+            text = "\n" if "\n" in text else " "
+        if not self.hidden:
+            for parts in self.captures:
+                parts.append(text)
+            self.string(text)
+
+    def push(self, name, attrs):
+        self.flush()
+        attrs = dict((k, v if v is not None else "") for k, v in attrs)
+        element = {'name': name, 'attrs': attrs, 'classes': attrs.get('class', "").split()}
+        self.stack.append(element)
+        self.open_names[name] = self.open_names.get(name, 0) + 1
+        self.hidden += name in HIDDEN_TEXT_ELEMENTS
+        self.preserve += name in PRESERVE_WHITESPACE_ELEMENTS
+        self.start(element)
+
+    def pop_to(self, name):
+        self.flush()
+        if not self.open_names.get(name):
+            return
+        while True:
+            element = self.stack.pop()
+            self.open_names[element['name']] -= 1
+            self.hidden -= element['name'] in HIDDEN_TEXT_ELEMENTS
+            self.preserve -= element['name'] in PRESERVE_WHITESPACE_ELEMENTS
+            self.end(element)
+            if element['name'] == name:
+                return
+
+    def handle_starttag(self, tag, attrs):
+        self.push(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self.pop_to(tag)
+            self.closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.push(tag, attrs)
+        self.pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void:
+            self.closed_void.remove(tag)
+        else:
+            self.pop_to(tag)
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_entityref(self, name):
+        self.data.append(ENTITIES.get(name, "&" + name))
+
+    def handle_charref(self, name):
+        number = int(name[1:], 16) if name[:1] in 'xX' else int(name)
+        self.data.append(html.unescape(f"&#{number};"))
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith("CDATA["):
+            self.data.append(data[len("CDATA["):])
+            hidden, self.hidden = self.hidden, 0
+            self.flush()
+            self.hidden = hidden
+
+    def run(self, content):
+        self.feed(content)
+        self.close()
+        self.flush()
+        while self.stack:
+            self.pop_to(self.stack[-1]['name'])
+
+class _CbclExtractor(_TextTracker):
+    """ Streaming counterpart of extract_cbcl_soup. """
+
+    REGIONS = (('entry-content', 'div'), ('field-item', 'div'), (None, 'body'))
+
+    def __init__(self):
+        super().__init__()
+        self.elements = []
+        self.regions = {}
+        self.open_regions = set()
+
+    def start(self, element):
+        if element['name'] in ('p', 'h3', 'h4', 'div'):
+            element['record'] = {'text': [], 'link': None, 'regions': set(self.open_regions)}
+            self.elements.append(element['record'])
+            self.capture(element['record']['text'])
+        if element['name'] == 'a':
+            element['link_text'] = []
+            self.capture(element['link_text'])
+            for record in (e['record'] for e in self.stack if 'record' in e):
+                if record['link'] is None:
+                    record['link'] = (element['attrs'].get('href'), element['link_text'])
+        for cls, name in self.REGIONS:
+            if cls not in self.regions and element['name'] == name and (cls is None or cls in element['classes']):
+                self.regions[cls] = element
+                element['region'] = cls
+                self.open_regions.add(cls)
+
+    def end(self, element):
+        if 'region' in element:
+            self.open_regions.discard(element['region'])
+        if 'record' in element:
+            self.release(element['record']['text'])
+        if 'link_text' in element:
+            self.release(element['link_text'])
+
+def extract_cbcl_stream(content):
+    parser = _CbclExtractor()
+    parser.run(content)
+    region = next((cls for cls, name in _CbclExtractor.REGIONS if cls in parser.regions), False)
+    if region is False:
+        return None
+    elements = []
+    for record in parser.elements:
+        if region in record['regions']:
+            link = record['link']
+            if link:
+                link = (link[0], "".join(link[1]))
+            elements.append({'text': "".join(record['text']), 'link': link})
+    return elements
+
+class _BiblioExtractor(_TextTracker):
+    """
+    Streaming counterpart of extract_biblio_soup. Strings inside an entry are
+    tagged with whether the reference implementation would have decomposed
+    them before taking the venue text. Section years are resolved at the end,
+    since a separator bar may follow the entries of its section, and one that
+    sits inside a decomposed part of an entry is hidden from that entry on.
+
+    Nested entries (from an unclosed entry div) are only flagged, on the
+    outer entry, along with the source positions of its subtree: the
+    reference decomposes parts of inner entries while handling the outer one.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+        self.entry = None
+        self.nested = False
+        self.closed = False
+        self.sections = []
+
+    def close(self):
+        super().close()
+        self.closed = True
+
+    def start(self, element):
+        classes = element['classes']
+        entry = self.entry
+        if entry is not None and element['name'] == 'div' and 'biblio-entry' in classes:
+            self.nested = entry['nested'] = True
+        if entry is None and element['name'] == 'div' and 'biblio-entry' in classes:
+            entry = self.entry = element
+            element['nested'] = False
+            element['span'] = [self.getpos(), None]
+            element['strings'] = []
+            element['removed'] = 0
+            element['fields'] = {'title': None, 'authors': None, 'pdf_href': None,
+                                 'first_href': None, 'in_file_links': False, 'file_links': False}
+            element['section'] = self.sections[-1] if self.sections else None
+            self.entries.append(element)
+        if 'biblio-category-section' in classes:
+            element['seps'] = []
+            self.sections.append(element)
+        if 'biblio-separator-bar' in classes:
+            element['text'] = []
+            self.capture(element['text'])
+            element['removed_by'] = len(self.entries) - 1 if entry is not None and entry['removed'] else None
+            for section in self.sections:
+                section['seps'].append(element)
+        if entry is None or element is entry:
+            return
+
+        fields = entry['fields']
+        removed = False
+        for field, cls in (('title', 'biblio-title'), ('authors', 'biblio-authors')):
+            if fields[field] is None and cls in classes:
+                fields[field] = element['text'] = []
+                self.capture(element['text'])
+                removed = True
+        if 'biblio_file_links' in classes and not fields['file_links']:
+            fields['file_links'] = fields['in_file_links'] = True
+            element['file_links'] = True
+        if 'biblio_file_links' in classes or 'Z3988' in classes:
+            removed = True
+        if element['name'] == 'a' and 'href' in element['attrs']:
+            if fields['first_href'] is None:
+                fields['first_href'] = element['attrs']['href']
+            if fields['in_file_links'] and fields['pdf_href'] is None:
+                fields['pdf_href'] = element['attrs']['href']
+        if removed:
+            element['removed'] = True
+            entry['removed'] += 1
+
+    def end(self, element):
+        if 'text' in element:
+            self.release(element['text'])
+        if element is self.entry:
+            # Whatever closes the entry (its end tag, an ancestor's, or the end of the page) isn't part of it
+            element['span'][1] = None if self.closed else self.getpos()
+            self.entry = None
+        elif self.entry is not None:
+            if element.get('removed'):
+                self.entry['removed'] -= 1
+            if element.get('file_links'):
+                self.entry['fields']['in_file_links'] = False
+        if 'seps' in element:
+            remove_identical(self.sections, element)
+
+    def string(self, text):
+        if self.entry is not None:
+            self.entry['strings'].append((text.strip(), self.entry['removed'] > 0))
+
+    def records(self):
+        records = []
+        for i, entry in enumerate(self.entries):
+            fields = entry['fields']
+            section = entry['section']
+            seps = section['seps'] if section else []
+            sep = next((sep for sep in seps if sep['removed_by'] is None or sep['removed_by'] > i), None)
+            records.append({
+                'title': "".join(fields['title']) if fields['title'] is not None else None,
+                'authors': "".join(fields['authors']) if fields['authors'] is not None else None,
+                'pdf_href': fields['pdf_href'],
+                'first_href': fields['first_href'],
+                'link_text': " ".join(t for t, _ in entry['strings'] if t),
+                'text': " ".join(t for t, removed in entry['strings'] if t and not removed),
+                'section_year': "".join(sep['text']).strip() if sep else "",
+            })
+        return records
+
+def extract_biblio_stream(content):
+    parser = _BiblioExtractor()
+    parser.run(content)
+    records = parser.records()
+    if not parser.nested:
+        return records
+
+    # An unclosed entry div swallowed the entries after it: hand just that
+    # subtree to the reference, which gives its entries the outer one's section year
+    line_starts = [0] + [match.end() for match in re.finditer('\n', content)]
+    def offset(position):
+        return line_starts[position[0] - 1] + position[1]
+    merged = []
+    for entry, record in zip(parser.entries, records):
+        if not entry['nested']:
+            merged.append(record)
+            continue
+        start, end = entry['span']
+        fragment = content[offset(start):offset(end) if end else len(content)]
+        merged.extend(extract_biblio_soup(fragment, section_year=record['section_year']))
+    return merged
+
+BACKENDS = {
+    'bs4': {'cbcl': extract_cbcl_soup, 'biblio': extract_biblio_soup},
+    'stream': {'cbcl': extract_cbcl_stream, 'biblio': extract_biblio_stream},
+}
+
+# --- PUBLICATIONS ---
+
+def cbcl_publications(elements):
+    """ Publications from the old CBCL page's candidate elements. """
+    publications = []
+
+    current_year = ""
+
+    for element in elements:
+        text = element['text'].strip()
 
-    for element in content_div.find_all(['p', 'h3', 'h4', 'div']): 
-        text = element.get_text().strip()
-        
         if re.match(r'^\d{4}:?$', text):
             current_year = text.replace(':', '').strip()
             continue
-            
+
         if not current_year:
             continue
-            
-        links = element.find_all('a')
-        if not links:
+
+        if not element['link']:
             continue
-            
-        paper_link = links[0].get('href')
-        title = links[0].get_text().strip()
-        
-        full_text = element.get_text()
-        
+
+        paper_link = element['link'][0]
+        title = element['link'][1].strip()
+
+        full_text = element['text']
+
         if title in full_text:
             parts = full_text.split(title, 1)
             authors = parts[0].strip().rstrip('.,[]')
@@ -49,9 +501,9 @@ def parse_old_cbcl():
         else:
             authors = "Unknown"
             venue_info = full_text
-            
+
         authors = re.sub(r'^\d+\.?\s*', '', authors).strip()
-        
+
         pub = {
             "title": title,
             "authors": authors,
@@ -60,189 +512,581 @@ def parse_old_cbcl():
             "link": paper_link
         }
         publications.append(pub)
-        
+
+    return publications
+
+# Precompiled patterns for biblio_publication
+ARXIV_LINK = re.compile(r'(?:at\s*<|arXiv:)\s*(https?://arxiv\.org/abs/[\d\.]+)')
+BRACKET_URL = re.compile(r'<\s*(https?://[^>]+)\s*>')
+PAREN_YEAR = re.compile(r'\((\d{4})\)')
+BARE_YEAR = re.compile(r'\b(19|20)\d{2}\b')
+URL_NOTE = re.compile(r'(?:at\s*<|arXiv:)\s*https?://[^>]+>?')
+
+def entry_year(text):
+    """ The first "(dddd)" in text, else its first bare 19xx / 20xx year, else "". """
+    match = PAREN_YEAR.search(text) if '(' in text else None
+    if match:
+        return match.group(1)
+    match = BARE_YEAR.search(text)
+    return match.group(0) if match else ""
+
+def entry_venue(text, title, authors, year):
+    """
+    What is left of the entry text once title, authors, year and any
+    "at <url>" / "arXiv: url" note are taken out, or "CBMM Publication".
+    """
+    for known in (title, authors, f"({year})" if year else "", year):
+        if known and known in text:
+            text = text.replace(known, "")
+    # split() and re's \s agree on what whitespace is; collapsing this way skips a match per word
+    text = " ".join(text.split()).strip(' .,')
+    if 'http' in text:
+        text = URL_NOTE.sub('', text)
+    text = text.strip(' .,<')
+    return text if len(text) > 2 else "CBMM Publication"
+
+def biblio_publication(record):
+    """
+    Builds a publication from one entry's raw fields: title / authors text
+    (None if missing), the first href inside the file links and anywhere in
+    the entry, the entry text before (link_text) and after (text) removing
+    file links, citation spans, title and authors, and the year of the
+    enclosing section's separator bar (see the extractors).
+
+    Uses precompiled patterns, collapses whitespace by split / join rather
+    than a regex match per word, and skips full-text passes for parts that
+    aren't there (see tests/fixtures/biblio_reference.py for the original).
+    """
+    title = record['title'].strip() if record['title'] is not None else "Unknown Title"
+
+    # Link - check for PDF first, otherwise title link; external links win over wrapper pages
+    link = record['pdf_href'] or record['first_href'] or ""
+    if link and not link.startswith('http'):
+        link = "https://cbmm.mit.edu" + link
+    if not link.lower().endswith('.pdf'):
+        match = ARXIV_LINK.search(record['link_text']) or BRACKET_URL.search(record['link_text'])
+        if match:
+            link = match.group(1)
+
+    if record['authors'] is not None:
+        authors = " ".join(record['authors'].split())
+    else:
+        authors = "Unknown"
+
+    year = record['section_year'] or entry_year(record['text'])
+
+    return {
+        "title": title,
+        "authors": authors,
+        "venue": entry_venue(record['text'], title, authors, year),
+        "year": year,
+        "link": link
+    }
+
+def page_kind(filename):
+    """ 'cbcl' for the old CBCL archive page, 'biblio' for CBMM listings. """
+    return 'cbcl' if os.path.basename(filename) == CBCL_PAGE else 'biblio'
+
+def page_order(filename):
+    """
+    Merge order: the CBCL page first, then by name with numbers compared
+    numerically (cbmm_page_2 before cbmm_page_10).
+    """
+    name = os.path.basename(filename)
+    parts = [int(p) if p.isdigit() else p for p in re.split(r'(\d+)', name)]
+    return (page_kind(filename) != 'cbcl', parts, filename)
+
+def discover_pages(paths=None):
+    """
+    Saved pages to parse, in merge order. Without paths: old_cbcl.html and
+    every cbmm_page_*.html in the working directory. Paths may be files,
+    globs or directories (every *.html inside).
+    """
+    if not paths:
+        found = glob.glob(CBMM_PAGES)
+        if os.path.exists(CBCL_PAGE):
+            found.append(CBCL_PAGE)
+    else:
+        found = []
+        for path in paths:
+            if os.path.isdir(path):
+                found.extend(glob.glob(os.path.join(path, '*.html')))
+            else:
+                found.extend(glob.glob(path) or [path])
+    return sorted(set(os.path.normpath(f) for f in found), key=page_order)
+
+def parse_page(filename, backend=None):
+    """ Publications on one saved page, parsed according to its kind. """
+    content = read_page(filename)
+    if content is None:
+        return []
+
+    extractors = BACKENDS[backend or DEFAULT_BACKEND]
+    if page_kind(filename) == 'cbcl':
+        elements = extractors['cbcl'](content)
+        if not elements:
+            return []
+        return cbcl_publications(elements)
+
+    publications = []
+    for record in extractors['biblio'](content):
+        try:
+            publications.append(biblio_publication(record))
+        except Exception as e:
+            print(f"Error parsing entry: {e}")
+            continue
+
     return publications
 
-def parse_cbmm_page(page_num):
+def parse_old_cbcl(backend=None):
+    return parse_page(CBCL_PAGE, backend)
+
+def parse_cbmm_page(page_num, backend=None):
     filename = f"cbmm_page_{page_num}.html"
     if not os.path.exists(filename):
         print(f"File {filename} not found.")
         return []
-        
+
     print(f"Parsing {filename}...")
+    return parse_page(filename, backend)
+
+def _parse_job(job):
+    """ Process pool worker: parses one page and times it. """
+    filename, backend, profile = job
+    instrumentation.start_worker(profile)
+    start = time.perf_counter()
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with instrumentation.stage('parse_page'):
+            publications = parse_page(filename, backend)
+        status = "ok"
     except Exception as e:
-        print(f"Error reading {filename}: {e}")
+        publications = []
+        status = f"error: {e}"
+    instrumentation.count('entries parsed', len(publications))
+    return {'file': filename, 'status': status, 'publications': publications,
+            'seconds': time.perf_counter() - start, 'profile': instrumentation.snapshot()}
+
+def parse_pages(filenames, backend=None, jobs=None):
+    """
+    Parses pages across a process pool. Reports come back in the order of
+    filenames (see discover_pages), so the merge is the same on every run.
+    """
+    if not filenames:
         return []
+    profile = instrumentation.worker_settings()
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=POOL_CONTEXT) as pool:
+        reports = list(pool.map(_parse_job, [(f, backend, profile) for f in filenames]))
+    for report in reports:
+        instrumentation.merge(report.pop('profile'))
+    return reports
 
-    soup = BeautifulSoup(content, 'html.parser')
-    publications = []
-    
-    # Logic: find 'biblio-entry' divs
-    
-    entries = soup.find_all('div', class_='biblio-entry')
-    
-    for entry in entries:
-        try:
-            # Title
-            title_elem = entry.find(class_='biblio-title')
-            title = title_elem.get_text().strip() if title_elem else "Unknown Title"
-            
-            # Link - check for PDF first, otherwise title link
-            pdf_span = entry.find(class_='biblio_file_links')
-            link = ""
-            if pdf_span:
-                pdf_link = pdf_span.find('a', href=True)
-                if pdf_link:
-                    link = pdf_link['href']
-            
-            if not link:
-                title_link = entry.find('a', href=True)
-                if title_link:
-                    link = title_link['href']
-            
-            if link and not link.startswith('http'):
-                link = "https://cbmm.mit.edu" + link
-
-            # Check for "at < url >" or "arXiv:..." if no PDF link found or as alternative
-            # Using regex on the full text of the entry (before decomposition)
-            # Re-read full text since we are iterating
-            full_text_for_link = entry.get_text(" ", strip=True)
-            
-            # Prefer PDF links. If link is already a PDF (ends with .pdf), keep it.
-            # If not a PDF, or if it's a wrapper page, look for external links.
-            is_pdf = link.lower().endswith('.pdf')
-            
-            if not is_pdf: 
-               # Look for arxiv link
-               arxiv_match = re.search(r'(?:at\s*<|arXiv:)\s*(https?://arxiv\.org/abs/[\d\.]+)', full_text_for_link)
-               if arxiv_match:
-                   link = arxiv_match.group(1)
-               else:
-                   # Look for general url in brackets < >
-                   url_match = re.search(r'<\s*(https?://[^>]+)\s*>', full_text_for_link)
-                   if url_match:
-                       link = url_match.group(1)
-
-            # Authors
-            authors_elem = entry.find(class_='biblio-authors')
-            if authors_elem:
-                authors = authors_elem.get_text().strip()
-                # Clean up multiple spaces/newlines
-                authors = re.sub(r'\s+', ' ', authors)
+# --- PARSE CACHE ---
+
+def page_cache_key(filename, backend=None):
+    """ Cache key for one page: (content sha256, page kind, backend, parser version), or None if unreadable. """
+    try:
+        with open(filename, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+    payload = json.dumps([digest, page_kind(filename), backend or DEFAULT_BACKEND, PARSER_VERSION])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_parse_cache(path=PARSE_CACHE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != PARSER_VERSION:
+        return {}
+    return cache.get('pages', {})
+
+def save_parse_cache(pages, path=PARSE_CACHE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': PARSER_VERSION, 'pages': pages}, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+def parse_pages_cached(filenames, backend=None, jobs=None, use_cache=True):
+    """
+    Like parse_pages, but pages whose cache key is in the parse cache are
+    not reparsed; their reports have status "cached". The cache is rewritten
+    with exactly this run's pages, so entries for removed or changed pages
+    are dropped.
+    """
+    cached = load_parse_cache() if use_cache else {}
+    keys = {f: page_cache_key(f, backend) for f in filenames}
+    reports = {}
+    for filename in filenames:
+        key = keys[filename]
+        if key in cached:
+            reports[filename] = {'file': filename, 'status': "cached",
+                                 'publications': cached[key], 'seconds': 0.0}
+            instrumentation.count('pages cached')
+    stale = [f for f in filenames if f not in reports]
+    for report in parse_pages(stale, backend=backend, jobs=jobs):
+        reports[report['file']] = report
+
+    pages = {}
+    for filename in filenames:
+        report = reports[filename]
+        if keys[filename] and report['status'] in ("ok", "cached"):
+            pages[keys[filename]] = report['publications']
+    if use_cache and (stale or set(pages) != set(cached)):
+        save_parse_cache(pages)
+    return [reports[f] for f in filenames]
+
+def write_if_changed(path, text):
+    """ Writes text to path unless the file already holds exactly that. Returns True if written. """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return True
+
+# --- SHARDED OUTPUT ---
+
+# Too common to be worth an index entry
+STOPWORDS = {'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is', 'of', 'on', 'or',
+             'the', 'to', 'with', 'et', 'al'}
+
+def get_year(p):
+    y = p['year']
+    try:
+        # Handle "In Press" or other non-digits if present, otherwise assume int
+        return int(re.search(r'\d{4}', str(y)).group(0))
+    except:
+        return 0
+
+def search_tokens(text):
+    """ Index tokens of a field: case-folded words, minus stopwords and single characters. """
+    words = re.findall(r'\w+', unicodedata.normalize('NFKC', text or "").casefold())
+    return {w for w in words if len(w) > 1 and w not in STOPWORDS}
+
+def build_shards(pubs):
+    """
+    Splits publications (sorted by get_year, descending) into year shards.
+    An entry's id is its position in pubs, so each shard covers the id range
+    [first, first + count). Rows are lists in SHARD_FIELDS order.
+
+    Returns (files, manifest): files maps file name to its minified JSON.
+    The index maps each field in INDEX_FIELDS to {token: [ids]}.
+    """
+    shards = {}
+    index = {field: {} for field in INDEX_FIELDS}
+    for i, pub in enumerate(pubs):
+        year = get_year(pub)
+        shard = shards.setdefault(year, {'year': str(year) if year else None, 'first': i, 'rows': []})
+        shard['rows'].append([pub.get(field) for field in SHARD_FIELDS])
+        for field in INDEX_FIELDS:
+            for token in search_tokens(pub.get(field)):
+                index[field].setdefault(token, []).append(i)
+
+    def dump(data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+    files = {}
+    manifest = {'version': 1, 'count': len(pubs), 'fields': SHARD_FIELDS, 'shards': []}
+    for year, shard in shards.items():
+        name = f"{year}.json" if year else "unknown.json"
+        files[name] = dump(shard['rows'])
+        manifest['shards'].append({'year': shard['year'], 'file': name, 'first': shard['first'],
+                                   'count': len(shard['rows']),
+                                   'sha256': hashlib.sha256(files[name].encode('utf-8')).hexdigest()[:16]})
+    files['index.json'] = dump({field: dict(sorted(tokens.items())) for field, tokens in index.items()})
+    manifest['index'] = {'file': 'index.json', 'fields': INDEX_FIELDS,
+                         'sha256': hashlib.sha256(files['index.json'].encode('utf-8')).hexdigest()[:16]}
+    return files, manifest
+
+def write_shards(pubs, out_dir=SHARDS_DIR):
+    """
+    Writes the shards, index and manifest.json to out_dir, each only if its
+    content changed, and removes shard files no longer listed. Returns
+    (files written, files total).
+    """
+    files, manifest = build_shards(pubs)
+    files['manifest.json'] = json.dumps(manifest, indent=1)
+    os.makedirs(out_dir, exist_ok=True)
+    written = sum(write_if_changed(os.path.join(out_dir, name), text) for name, text in files.items())
+    for stale in set(os.listdir(out_dir)) - set(files):
+        if stale.endswith('.json'):
+            os.remove(os.path.join(out_dir, stale))
+    return written, len(files)
+
+def check_parity(filenames):
+    """
+    Parses each saved page with every backend and reports where the results
+    differ from the BeautifulSoup reference. Returns True if they all agree.
+    """
+    agree = True
+    for filename in filenames:
+        content = read_page(filename)
+        if content is None:
+            agree = False
+            continue
+        kind = page_kind(filename)
+        results = {}
+        for name, extractors in BACKENDS.items():
+            start = time.perf_counter()
+            results[name] = extractors[kind](content)
+            results[name + "_seconds"] = time.perf_counter() - start
+        reference = results['bs4']
+        timings = "  ".join(f"{name} {results[name + '_seconds'] * 1000:.1f}ms" for name in BACKENDS)
+        for name in BACKENDS:
+            if results[name] == reference:
+                continue
+            agree = False
+            got = results[name] or []
+            for i, (want, have) in enumerate(zip(reference or [], got)):
+                if want != have:
+                    print(f"{filename}: {name} differs at entry {i}:\n  bs4:    {want}\n  {name}: {have}")
+                    break
             else:
-                authors = "Unknown"
-            
-            # Remove unwanted elements before getting text (copying first to avoid destroying original if needed, 
-            # but here we can modify entry since we extracted info already)
-            
-            # Decompose file links, Z3988 (citation), and extracted title/authors
-            # This ensures they don't appear in the venue text
-            for elem in entry.find_all(class_=['biblio_file_links', 'Z3988']):
-                elem.decompose()
-                
-            # We can also decompose title and authors to ensure they are definitely gone from text
-            if title_elem:
-                # Note: title might be inside an 'a' tag which might be separate or inside
-                # Usually title_elem is the span.biblio-title.
-                title_elem.decompose()
-            
-            if authors_elem:
-                authors_elem.decompose()
-                
-            # Venue & Year from text
-            # The text inside biblio-entry but outside spans usually contains venue and year
-            full_text = entry.get_text(" ", strip=True)
-            
-            # Year extraction
-            year = ""
-            # Check context: parent 'biblio-category-section' -> 'biblio-separator-bar'
-            section = entry.find_parent(class_='biblio-category-section')
-            if section:
-                sep = section.find(class_='biblio-separator-bar')
-                if sep:
-                    year = sep.get_text().strip()
-            
-            if not year:
-                # Fallback to regex in entry text
-                match = re.search(r'\((\d{4})\)', full_text)
-                if match:
-                    year = match.group(1)
-                else:
-                    match = re.search(r'\b(19|20)\d{2}\b', full_text)
-                    if match:
-                        year = match.group(0)
-
-            # Venue extraction
-            # Try to subtract known parts from full text? Or just take what looks like venue.
-            # Usually: Authors Title. Venue. (Year).
-            # Easier: Just use "CBMM Publication" if parsing fails, or try to get everything between title end and year.
-            
-            venue = "CBMM Publication"
-            # Attempt to extract venue
-            # Remove title and authors from text
-            temp_text = full_text.replace(title, "").replace(authors, "")
-            # Remove "(Year)"
-            if year:
-                temp_text = temp_text.replace(f"({year})", "").replace(year, "")
-            
-            # Clean up
-            temp_text = re.sub(r'\s+', ' ', temp_text).strip(' .,')
-            
-            # Remove "at < url >" from venue text if present
-            temp_text = re.sub(r'(?:at\s*<|arXiv:)\s*https?://[^>]+>?', '', temp_text).strip(' .,<')
-            
-            if len(temp_text) > 2: # reasonable length
-                 venue = temp_text
-
-            pub = {
-                "title": title,
-                "authors": authors,
-                "venue": venue, 
-                "year": year,
-                "link": link
-            }
-            publications.append(pub)
-            
-        except Exception as e:
-            print(f"Error parsing entry: {e}")
+                print(f"{filename}: {name} found {len(got)} entries, bs4 found {len(reference or [])}")
+        print(f"{filename}: {len(reference or [])} entries  {timings}")
+    return agree
+
+# --- DEDUPLICATION ---
+
+# Titles whose normalized keys are this similar (difflib ratio) are merged
+DEDUP_THRESHOLD = 0.96
+# Shorter keys are only merged on an exact match
+DEDUP_MIN_LENGTH = 12
+# MinHash over character 3-grams, banded for LSH: keys sharing any band are
+# compared. 8 bands of 4 rows catch pairs down to ~0.6 3-gram Jaccard, well
+# below what a DEDUP_THRESHOLD match has.
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+MINHASH_MASKS = [random.Random(f"minhash-{i}").getrandbits(64) for i in range(MINHASH_BANDS * MINHASH_ROWS)]
+# Series numbers ("Theory III", "Part 2", "IIb"): near-identical titles that
+# differ in one of these are different papers
+SERIES_TOKEN = re.compile(r'(?:\d+|(?=[ivxlcdm])m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3}))[ab]?')
+
+def normalize_title(title):
+    """
+    Dedup key: Unicode-normalized, case-folded, with punctuation (including
+    curly quotes and trailing periods) dropped and whitespace collapsed.
+    """
+    title = unicodedata.normalize('NFKC', title).casefold()
+    return " ".join(re.sub(r'[^\w\s]', ' ', title).split())
+
+def series_tokens(key):
+    """ The numeric and Roman-numeral words of a normalized title, in order. """
+    return [word for word in key.split() if SERIES_TOKEN.fullmatch(word)]
+
+def minhash(key):
+    """ MinHash signature of key's character 3-grams (XOR-masked 64-bit hashes). """
+    padded = f" {key} "
+    hashes = set(int.from_bytes(hashlib.blake2b(padded[i:i + 3].encode('utf-8'), digest_size=8).digest(), 'big')
+                 for i in range(max(1, len(padded) - 2)))
+    return [min(h ^ mask for h in hashes) for mask in MINHASH_MASKS]
+
+def is_pdf(pub):
+    return (pub['link'] or "").strip().lower().endswith('.pdf')
+
+def merge_cluster(cluster):
+    """
+    One publication for a cluster of duplicates (given in merge order). The
+    primary entry is the first with a PDF link, then with a year, then with
+    a real venue; an empty year or placeholder venue is filled in from the
+    others, in order.
+    """
+    primary = min(range(len(cluster)), key=lambda i: (not is_pdf(cluster[i]), not cluster[i]['year'],
+                                                      cluster[i]['venue'] in ("", "CBMM Publication"), i))
+    merged = dict(cluster[primary])
+    for pub in cluster:
+        if not merged['year'] and pub['year']:
+            merged['year'] = pub['year']
+        if merged['venue'] in ("", "CBMM Publication") and pub['venue'] not in ("", "CBMM Publication"):
+            merged['venue'] = pub['venue']
+    return primary, merged
+
+def dedupe_publications(pubs, threshold=DEDUP_THRESHOLD):
+    """
+    Merges duplicate publications. Exact matches on normalize_title are found
+    through a dict; near-duplicates through MinHash LSH buckets, each
+    candidate pair confirmed by its difflib ratio. Both steps are close to
+    linear in the number of entries. Entries whose years disagree are never
+    merged, not even on an exact match. A near-duplicate pair is
+    only merged if both titles carry the same series numbers (see
+    series_tokens) and are at least DEDUP_MIN_LENGTH long, and an undated
+    entry with a short title isn't merged into dated ones.
+
+    Returns (publications, report): each cluster becomes one entry at the
+    position of its first member (see merge_cluster), and the report lists
+    every merge with the titles and links it dropped.
+    """
+    keys = [normalize_title(p['title']) for p in pubs]
+    parent = list(range(len(pubs)))
+    how = {}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j, reason):
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+            how.setdefault(min(i, j), set()).add(reason)
+
+    # Exact matches on the normalized key, one group per year: an undated
+    # entry joins the key's first dated group (or the undated group if there
+    # is none), unless the key is short enough to be a generic title
+    first = {}
+    years = {}
+    groups = {}
+    for i, key in enumerate(keys):
+        if not key:
+            continue
+        first.setdefault(key, i)
+        groups.setdefault(key, {}).setdefault(pubs[i]['year'], []).append(i)
+        if pubs[i]['year']:
+            years.setdefault(key, set()).add(pubs[i]['year'])
+    for key, by_year in groups.items():
+        undated = by_year.pop("", [])
+        for members in by_year.values():
+            for i in members[1:]:
+                union(members[0], i, "normalized")
+        if by_year and len(key) >= DEDUP_MIN_LENGTH:
+            target = min(members[0] for members in by_year.values())
+        else:
+            target = undated[0] if undated else None
+        for i in undated:
+            union(target, i, "normalized")
+
+    # Near-duplicates: only keys sharing an LSH bucket are compared
+    buckets = {}
+    for key in first:
+        if len(key) < DEDUP_MIN_LENGTH:
             continue
+        signature = minhash(key)
+        for band in range(MINHASH_BANDS):
+            rows = tuple(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS])
+            buckets.setdefault((band, rows), []).append(key)
+    compared = set()
+    for bucket in buckets.values():
+        for a in range(len(bucket)):
+            for b in range(a + 1, len(bucket)):
+                pair = (bucket[a], bucket[b])
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                if series_tokens(pair[0]) != series_tokens(pair[1]):
+                    continue
+                if pair[0] in years and pair[1] in years and not years[pair[0]] & years[pair[1]]:
+                    continue
+                matcher = difflib.SequenceMatcher(None, *pair)
+                # Cheap upper bounds first
+                if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                    continue
+                ratio = matcher.ratio()
+                if ratio < threshold:
+                    continue
+                # Dated on both sides: join the groups of each shared year
+                shared = years.get(pair[0], set()) & years.get(pair[1], set())
+                for year in sorted(shared):
+                    union(groups[pair[0]][year][0], groups[pair[1]][year][0], f"fuzzy {ratio:.2f}")
+                if not shared:
+                    union(first[pair[0]], first[pair[1]], f"fuzzy {ratio:.2f}")
 
-    return publications
+    clusters = {}
+    for i in range(len(pubs)):
+        clusters.setdefault(find(i), []).append(i)
+    unique = []
+    report = []
+    for root, members in clusters.items():
+        primary, merged = merge_cluster([pubs[i] for i in members])
+        unique.append(merged)
+        if len(members) > 1:
+            report.append({'kept': {'title': merged['title'], 'year': merged['year'], 'link': merged['link']},
+                           'dropped': [{'title': pubs[i]['title'], 'year': pubs[i]['year'], 'link': pubs[i]['link']}
+                                       for position, i in enumerate(members) if position != primary],
+                           'how': sorted(how.get(root, ()))})
+    return unique, report
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape saved publication pages into app/data/publications.json.")
+    parser.add_argument('pages', nargs='*',
+                        help=f"saved pages, globs or directories of *.html (default: {CBCL_PAGE} and {CBMM_PAGES})")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help=f"page parser (default: {DEFAULT_BACKEND}; bs4 is the reference)")
+    parser.add_argument('--check-parity', action='store_true',
+                        help="compare every backend against bs4 on the pages and exit")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"reparse every page, ignoring and not updating {PARSE_CACHE_FILE}")
+    parser.add_argument('--no-shards', action='store_true', help=f"don't write the year shards and index to {SHARDS_DIR}")
+    parser.add_argument('--enrich', action='store_true',
+                        help="check links and fill missing years / venues from arXiv (see enrich_publications.py)")
+    parser.add_argument('--dedup-report', metavar='JSON', help="write the list of merged duplicates here")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.start(args)
+
+    pages = discover_pages(args.pages)
+    if args.check_parity:
+        if not pages:
+            print("No saved pages to compare.")
+            sys.exit(1)
+        ok = check_parity(pages)
+        print("Backends agree." if ok else "Backends differ.")
+        sys.exit(0 if ok else 1)
+
+    print(f"Parsing {len(pages)} pages...")
+    start = time.perf_counter()
     all_pubs = []
-    
-    print("Parsing Old CBCL...")
-    old_pubs = parse_old_cbcl()
-    print(f"Found {len(old_pubs)} from Old CBCL")
-    all_pubs.extend(old_pubs)
-    
-    print("Parsing CBMM pages...")
-    for i in range(8): 
-        pubs = parse_cbmm_page(i)
-        print(f"Found {len(pubs)} on page {i}")
-        all_pubs.extend(pubs)
+    with instrumentation.stage('parse'):
+        reports = parse_pages_cached(pages, backend=args.backend, jobs=args.jobs, use_cache=not args.no_cache)
+    for report in reports:
+        print(f"  {report['status']:<6} {report['seconds']:6.2f}s  {len(report['publications']):4d} found  {report['file']}")
+        all_pubs.extend(report['publications'])
         
-    print(f"Total publications: {len(all_pubs)}")
+    print(f"Total publications: {len(all_pubs)} ({time.perf_counter() - start:.2f}s)")
     
-    unique_pubs = list({p['title']: p for p in all_pubs}.values())
+    with instrumentation.stage('dedupe'):
+        unique_pubs, merges = dedupe_publications(all_pubs)
+    instrumentation.count('duplicates merged', len(all_pubs) - len(unique_pubs))
+    print(f"Merged {len(all_pubs) - len(unique_pubs)} duplicates into {len(merges)} entries")
+    for merge in merges:
+        print(f"  {merge['kept']['title'][:70]!r} <- {len(merge['dropped'])} ({', '.join(merge['how'])})")
+    if args.dedup_report:
+        with open(args.dedup_report, 'w') as f:
+            json.dump(merges, f, indent=2)
     
+    if args.enrich:
+        # Imported here: enrich_publications builds on this module
+        import enrich_publications
+        with instrumentation.stage('enrich'):
+            cache = enrich_publications.load_cache()
+            unique_pubs, enrich_report = enrich_publications.enrich(unique_pubs, cache)
+            enrich_publications.save_cache(cache)
+        enrich_publications.print_report(enrich_report)
+
     # Sort by year descending. Handle empty years.
-    def get_year(p):
-        y = p['year']
-        try:
-            # Handle "In Press" or other non-digits if present, otherwise assume int
-            return int(re.search(r'\d{4}', str(y)).group(0))
-        except:
-            return 0
-            
     sorted_pubs = sorted(unique_pubs, key=get_year, reverse=True)
     
-    with open('app/data/publications.json', 'w') as f:
-        json.dump(sorted_pubs, f, indent=2)
+    # Only touch the file when the result changed, so the site build's
+    # publications page isn't invalidated for nothing
+    with instrumentation.stage('write'):
+        if write_if_changed(PUBLICATIONS_FILE, json.dumps(sorted_pubs, indent=2)):
+            print(f"Wrote {len(sorted_pubs)} publications to {PUBLICATIONS_FILE}")
+        else:
+            print(f"{PUBLICATIONS_FILE} unchanged")
+
+        if not args.no_shards:
+            written, total = write_shards(sorted_pubs)
+            print(f"{written} of {total} shard files updated in {SHARDS_DIR}")
+    instrumentation.finish(args)
         
 if __name__ == "__main__":
     main()
@@ -0,0 +1,154 @@
+"""
+Golden records for scrape_publications.biblio_publication.
+
+The expected outputs in biblio_golden.json were produced by the original
+entry post-processing (biblio_publication_reference) from records shaped
+like the CBMM listing (golden_records). They cover the entries of
+app/data/publications.json that the first such record reproduces exactly;
+the rest come from the CBCL archive page, which has its own parser. Run this
+file to regenerate them.
+"""
+import json
+import os
+import re
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_FILE = os.path.join(HERE, 'biblio_golden.json')
+PUBLICATIONS_FILE = os.path.join(HERE, '..', '..', 'app', 'data', 'publications.json')
+# Fields checked per golden record; the expected outputs only list those that
+# differ from the publication itself
+GOLDEN_FIELDS = ['venue', 'year', 'link']
+
+def biblio_publication_reference(record):
+    """
+    Original entry post-processing, kept as the reference for
+    scrape_publications.biblio_publication. Builds a publication from one
+    entry's raw fields: title / authors text
+    (None if missing), the first href inside the file links and anywhere in
+    the entry, the entry text before (link_text) and after (text) removing
+    file links, citation spans, title and authors, and the year of the
+    enclosing section's separator bar.
+    """
+    title = record['title'].strip() if record['title'] is not None else "Unknown Title"
+
+    # Link - check for PDF first, otherwise title link
+    link = record['pdf_href'] or ""
+
+    if not link:
+        if record['first_href'] is not None:
+            link = record['first_href']
+
+    if link and not link.startswith('http'):
+        link = "https://cbmm.mit.edu" + link
+
+    full_text_for_link = record['link_text']
+
+    # Prefer PDF links. If link is already a PDF (ends with .pdf), keep it.
+    # If not a PDF, or if it's a wrapper page, look for external links.
+    is_pdf = link.lower().endswith('.pdf')
+
+    if not is_pdf:
+       # Look for arxiv link
+       arxiv_match = re.search(r'(?:at\s*<|arXiv:)\s*(https?://arxiv\.org/abs/[\d\.]+)', full_text_for_link)
+       if arxiv_match:
+           link = arxiv_match.group(1)
+       else:
+           # Look for general url in brackets < >
+           url_match = re.search(r'<\s*(https?://[^>]+)\s*>', full_text_for_link)
+           if url_match:
+               link = url_match.group(1)
+
+    # Authors
+    if record['authors'] is not None:
+        authors = record['authors'].strip()
+        # Clean up multiple spaces/newlines
+        authors = re.sub(r'\s+', ' ', authors)
+    else:
+        authors = "Unknown"
+
+    full_text = record['text']
+
+    # Year extraction
+    year = record['section_year']
+
+    if not year:
+        # Fallback to regex in entry text
+        match = re.search(r'\((\d{4})\)', full_text)
+        if match:
+            year = match.group(1)
+        else:
+            match = re.search(r'\b(19|20)\d{2}\b', full_text)
+            if match:
+                year = match.group(0)
+
+    # Venue extraction
+    # Try to subtract known parts from full text? Or just take what looks like venue.
+    # Usually: Authors Title. Venue. (Year).
+    # Easier: Just use "CBMM Publication" if parsing fails, or try to get everything between title end and year.
+
+    venue = "CBMM Publication"
+    # Attempt to extract venue
+    # Remove title and authors from text
+    temp_text = full_text.replace(title, "").replace(authors, "")
+    # Remove "(Year)"
+    if year:
+        temp_text = temp_text.replace(f"({year})", "").replace(year, "")
+
+    # Clean up
+    temp_text = re.sub(r'\s+', ' ', temp_text).strip(' .,')
+
+    # Remove "at < url >" from venue text if present
+    temp_text = re.sub(r'(?:at\s*<|arXiv:)\s*https?://[^>]+>?', '', temp_text).strip(' .,<')
+
+    if len(temp_text) > 2: # reasonable length
+         venue = temp_text
+
+    return {
+        "title": title,
+        "authors": authors,
+        "venue": venue,
+        "year": year,
+        "link": link
+    }
+
+def golden_records(pub):
+    """
+    Raw entry records shaped like the CBMM listing would give for a published
+    entry: venue and year in the text with the year on the section bar, the
+    year only in the text (in parentheses, then bare), title and authors left
+    in the text, and an arXiv note. The first one should reproduce pub.
+    """
+    venue = pub['venue'] if pub['venue'] != "CBMM Publication" else ""
+    year = pub['year']
+    link = pub['link']
+    base = {'title': f" {pub['title']}\n", 'authors': pub['authors'].replace(", ", ",\n  "),
+            'pdf_href': link if link.lower().endswith('.pdf') else None, 'first_href': link}
+    texts = [(f"{venue}. ({year}).", year), (f"{venue}. ({year}).", ""), (f"{venue}, {year}", ""),
+             (f"{pub['authors']} {pub['title']}. {venue} ({year}).", ""),
+             (f"{venue} at < https://arxiv.org/abs/1703.00001 > ({year}).", year)]
+    for text, section_year in texts:
+        link_text = f"{pub['authors']} {pub['title']} {text}"
+        yield dict(base, text=text, link_text=link_text, section_year=section_year)
+
+def write_golden(path=GOLDEN_FILE, publications_file=PUBLICATIONS_FILE):
+    """
+    Stores each reproducible publication with the reference GOLDEN_FIELDS of
+    each of its golden records.
+    """
+    with open(publications_file, 'r', encoding='utf-8') as f:
+        publications = json.load(f)
+    cases = []
+    for pub in publications:
+        expected = [biblio_publication_reference(record) for record in golden_records(pub)]
+        if expected[0] != pub:
+            continue
+        cases.append({'publication': pub,
+                      'expected': [{field: e[field] for field in GOLDEN_FIELDS if e[field] != pub[field]}
+                                   for e in expected]})
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[\n" + ",\n".join(json.dumps(case, ensure_ascii=False) for case in cases) + "\n]\n")
+    print(f"Wrote {len(cases)} golden cases to {path}")
+
+if __name__ == "__main__":
+    write_golden(*sys.argv[1:])
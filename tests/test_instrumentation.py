@@ -0,0 +1,52 @@
+import threading
+
+import instrumentation
+
+def allocate(n):
+    block = bytearray(n)
+    del block
+
+def test_nested_stages_on_one_thread_keep_their_own_peaks():
+    instrumentation.enable(memory=True)
+    try:
+        with instrumentation.stage('outer'):
+            allocate(4_000_000)
+            with instrumentation.stage('inner'):
+                allocate(1_000_000)
+        stages = instrumentation.report()['stages']
+    finally:
+        instrumentation.disable()
+    assert 1_000_000 <= stages['outer;inner']['peak_bytes'] < 2_000_000
+    assert stages['outer']['peak_bytes'] >= 4_000_000
+    assert stages['outer']['peak_reliable'] and stages['outer;inner']['peak_reliable']
+
+def test_stages_overlapping_across_threads_are_marked_unreliable():
+    instrumentation.enable(memory=True)
+    opened = threading.Event()
+    release = threading.Event()
+
+    def worker():
+        with instrumentation.stage('worker'):
+            opened.set()
+            release.wait()
+
+    try:
+        thread = threading.Thread(target=worker)
+        with instrumentation.stage('main'):
+            thread.start()
+            opened.wait()
+            with instrumentation.stage('big'):
+                allocate(8_000_000)
+            release.set()
+            thread.join()
+        with instrumentation.stage('alone'):
+            allocate(1_000_000)
+        stages = instrumentation.report()['stages']
+    finally:
+        instrumentation.disable()
+    assert stages['worker']['peak_reliable'] is False
+    assert stages['main;big']['peak_reliable'] is False
+    assert stages['main']['peak_reliable'] is False
+    # A later stage with nothing else open gets an exact peak again
+    assert stages['alone']['peak_reliable'] is True
+    assert stages['alone']['peak_bytes'] < 8_000_000
@@ -0,0 +1,97 @@
+import hashlib
+import http.server
+import json
+import os
+import threading
+import time
+
+import markdownify
+
+def write_export(path, blocks, **result):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'result': dict(result, chunks=[{'blocks': blocks}])}, f)
+
+def test_skips_multi_megabyte_fields_in_linear_time(tmp_path):
+    export = tmp_path / "export.json"
+    big = 'x\\"y' * 2_000_000  # 8 MB, with escapes across every chunk boundary
+    write_export(export, [
+        {'type': 'Title', 'content': "Post", 'chart_data': big, 'bbox': list(range(500_000))},
+        {'type': 'Text', 'content': "after", 'image_url': None},
+    ], ocr={'text': big})
+    start = time.perf_counter()
+    blocks = list(markdownify.iter_blocks(str(export)))
+    assert time.perf_counter() - start < 5
+    assert blocks == [{'type': 'Title', 'content': "Post"}, {'type': 'Text', 'content': "after", 'image_url': None}]
+
+def test_reads_multi_megabyte_content(tmp_path):
+    export = tmp_path / "export.json"
+    content = "é\n\"" * 1_000_000
+    write_export(export, [{'type': 'Text', 'content': content}])
+    start = time.perf_counter()
+    blocks = list(markdownify.iter_blocks(str(export)))
+    assert time.perf_counter() - start < 5
+    assert blocks == [{'type': 'Text', 'content': content}]
+
+def test_matches_json_load_at_any_chunk_size(tmp_path, monkeypatch):
+    export = tmp_path / "export.json"
+    text = 'a\\"b{[é\n'
+    blocks = [{'type': 'Text', 'content': text, 'bbox': [text, {'x': [1, -2.5e3, True, None]}], 'image_url': None},
+              {'type': text, text: text, 'content': [text, 1]}]
+    write_export(export, blocks)
+    expected = [{k: v for k, v in b.items() if k in markdownify.BLOCK_FIELDS} for b in blocks]
+    for size in (1, 2, 3, 5, 64):
+        monkeypatch.setattr(markdownify, 'READ_CHUNK', size)
+        assert list(markdownify.iter_blocks(str(export))) == expected
+
+class _ImageServer(http.server.BaseHTTPRequestHandler):
+    """ Serves a PNG per file name (so every job's copy of a figure is the same) with ETags. """
+    statuses = []
+
+    def do_GET(self):
+        name = os.path.basename(self.path.split('?')[0])
+        body = b"\x89PNG\r\n\x1a\n" + name.encode() * 16
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.statuses.append(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.statuses.append(200)
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_reexport_with_new_object_keys_does_not_refetch_figures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _ImageServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    _ImageServer.statuses = []
+
+    def export(job, figures):
+        blocks = [{'type': 'Title', 'content': "Post"}]
+        blocks += [{'type': 'Figure', 'content': f"caption {name}", 'image_url': f"{base}/{job}/{name}.png?sig={job}"}
+                   for name in figures]
+        write_export(tmp_path / "export.json", blocks)
+        return markdownify.process_file(str(tmp_path / "export.json"), incremental=True, output_dir="out")
+
+    try:
+        slug = export("job1", ["a", "b"])
+        assert _ImageServer.statuses == [200, 200]
+        _ImageServer.statuses = []
+        export("job2", ["a", "b"])
+        assert _ImageServer.statuses == [304, 304]
+        _ImageServer.statuses = []
+        export("job3", ["a", "c"])
+        assert sorted(_ImageServer.statuses) == [200, 304]
+    finally:
+        server.shutdown()
+    assets = tmp_path / "out" / slug / "assets"
+    assert sorted(p.name for p in assets.iterdir()) == ["image_0.png", "image_1.png"]
+    assert (assets / "image_1.png").read_bytes().endswith(b"c.png")
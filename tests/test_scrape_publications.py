@@ -0,0 +1,68 @@
+import json
+
+import scrape_publications
+from fixtures import biblio_reference
+
+def pub(title, year, link=""):
+    return {'title': title, 'authors': "", 'venue': "", 'year': year, 'link': link}
+
+def titles(pubs):
+    return [(p['title'], p['year']) for p in pubs]
+
+def test_same_title_from_different_years_is_not_merged():
+    pubs = [pub("B", "2002"), pub("b", "2001"),
+            pub("On Invariance and Selectivity", "2016"), pub("On invariance and selectivity", "2015")]
+    unique, report = scrape_publications.dedupe_publications(pubs)
+    assert titles(unique) == titles(pubs)
+    assert report == []
+
+def test_same_title_merges_within_a_year_and_with_undated_entries():
+    pubs = [pub("On Invariance and Selectivity", "2016"), pub("On invariance and selectivity.", "2015"),
+            pub("On invariance and selectivity", ""), pub("On Invariance and Selectivity", "2015", "x.pdf")]
+    unique, report = scrape_publications.dedupe_publications(pubs)
+    assert titles(unique) == [("On Invariance and Selectivity", "2016"), ("On Invariance and Selectivity", "2015")]
+    assert [r['how'] for r in report] == [["normalized"], ["normalized"]]
+
+def test_short_undated_title_is_not_merged_into_dated_ones():
+    pubs = [pub("Editorial", "2010"), pub("editorial", ""), pub("Editorial.", "")]
+    unique, report = scrape_publications.dedupe_publications(pubs)
+    assert titles(unique) == [("Editorial", "2010"), ("editorial", "")]
+
+def test_entry_post_processing_matches_golden_outputs():
+    with open(biblio_reference.GOLDEN_FILE, 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+    assert cases
+    for case in cases:
+        pub = case['publication']
+        for record, expected in zip(biblio_reference.golden_records(pub), case['expected']):
+            got = scrape_publications.biblio_publication(record)
+            want = dict({field: pub[field] for field in biblio_reference.GOLDEN_FIELDS}, **expected)
+            assert {field: got[field] for field in biblio_reference.GOLDEN_FIELDS} == want, record
+
+NESTED_PAGE = """<html><body><div class="view-content">
+<div class="biblio-category-section"><div class="biblio-separator-bar">2021</div>
+<div class="biblio-entry"><span class="biblio-title">First</span> Venue A (2021).</div>
+<div class="biblio-entry"><span class="biblio-authors">Doe, J.</span><span class="biblio-title">Unclosed</span>
+ Venue B. <span class="biblio_file_links"><a href="b.pdf">PDF</a></span>
+<div class="biblio-entry"><span class="biblio-title">Inner</span> Venue C (2019).
+ <span class="biblio_file_links"><a href="c.pdf">PDF</a></span></div>
+</div>
+<div class="biblio-category-section"><div class="biblio-separator-bar">2020</div>
+<div class="biblio-entry"><span class="biblio-title">Later</span> Venue D (2020).</div>
+</div></div></body></html>
+"""
+
+def test_nested_entries_reparse_only_their_subtree(monkeypatch):
+    want = scrape_publications.extract_biblio_soup(NESTED_PAGE)
+    fragments = []
+    soup = scrape_publications.extract_biblio_soup
+    def recording_soup(content, **kwargs):
+        fragments.append(content)
+        return soup(content, **kwargs)
+    monkeypatch.setattr(scrape_publications, 'extract_biblio_soup', recording_soup)
+    got = scrape_publications.extract_biblio_stream(NESTED_PAGE)
+    assert got == want
+    assert [r['title'] for r in got] == ["First", "Unclosed", "Inner", "Later"]
+    assert len(fragments) == 1
+    assert fragments[0].startswith('<div class="biblio-entry"><span class="biblio-authors">')
+    assert "Later" not in fragments[0]